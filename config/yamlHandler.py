@@ -1,10 +1,15 @@
 import os
 import yaml
+from dataclasses import dataclass
 
 config_path = os.path.join(os.path.dirname(__file__), "conf.yml")
 
-with open(config_path, "r", encoding="utf-8-sig") as file:
-    _config = yaml.safe_load(file)
+def _read_config_file():
+    with open(config_path, "r", encoding="utf-8-sig") as file:
+        return yaml.safe_load(file) or {}
+
+_config = _read_config_file()
+_config_mtime = os.path.getmtime(config_path)
 
 def _normalize(value):
     if isinstance(value, bool) or isinstance(value, (int, float)):
@@ -35,4 +40,168 @@ def get_value(*keys):
             value = value[key]
         else:
             raise KeyError(f"Key path {' -> '.join(keys)} not found in config.")
-    return _normalize(value)
\ No newline at end of file
+    return _normalize(value)
+
+# Typed snapshot of the values read on hot paths (every message / event).
+# Built once per load so callers do attribute reads instead of get_value() walks.
+
+@dataclass(frozen=True, slots=True)
+class Systems:
+    filter: bool
+    leveling: bool
+    yt: bool
+    welcome: bool
+
+@dataclass(frozen=True, slots=True)
+class FilterSettings:
+    detection_threshold: int
+
+@dataclass(frozen=True, slots=True)
+class FlagSettings:
+    can_flag_admins: bool
+    filter_affects_admins: bool
+    mute_time: int
+    warn_dm: str
+    flag_limit: int
+    review_channel: int
+
+@dataclass(frozen=True, slots=True)
+class Roles:
+    verified: int
+    lockdown: int
+    mod: int
+    bot_manager: int
+
+@dataclass(frozen=True, slots=True)
+class LevelingSettings:
+    channel_id: int
+    embed_title: str
+    embed_description: str
+    embed_field: str
+
+@dataclass(frozen=True, slots=True)
+class WelcomeSettings:
+    channel_id: int
+    welcome_message: str
+    goodbye_message: str
+    show_card_on_enter: bool
+    show_card_on_leave: bool
+    banner_disk_cache: bool
+    raid_joins_per_second: int
+    raid_window: int
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    guild_id: int
+    log_id: int
+    verify_id: int
+    systems: Systems
+    filter: FilterSettings
+    flags: FlagSettings
+    roles: Roles
+    leveling: LevelingSettings
+    welcome: WelcomeSettings
+
+_TRUTHY = ("1", "true", "yes", "on", "y", "t")
+
+def _lookup(raw, keys, default):
+    value = raw
+    for key in keys:
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return default
+    return default if value is None else value
+
+def _as_bool(raw, *keys, default=False) -> bool:
+    value = _lookup(raw, keys, default)
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUTHY
+    return bool(value)
+
+def _as_int(raw, *keys, default=0) -> int:
+    value = _lookup(raw, keys, default)
+    if value == "":
+        return default
+    try:
+        return int(_normalize(value))
+    except (TypeError, ValueError):
+        print(f"[config] {' -> '.join(keys)} is not a number ({value!r}), using {default}")
+        return default
+
+def _as_str(raw, *keys, default="") -> str:
+    return str(_lookup(raw, keys, default))
+
+def _build_config(raw: dict) -> Config:
+    return Config(
+        guild_id=_as_int(raw, "GUILD_ID"),
+        log_id=_as_int(raw, "LOG_ID"),
+        verify_id=_as_int(raw, "VERIFY_ID"),
+        systems=Systems(
+            filter=_as_bool(raw, "systems", "filter"),
+            leveling=_as_bool(raw, "systems", "leveling"),
+            yt=_as_bool(raw, "systems", "yt"),
+            welcome=_as_bool(raw, "systems", "welcome"),
+        ),
+        filter=FilterSettings(
+            detection_threshold=_as_int(raw, "behaviour", "filter", "DETECTION_THRESHOLD", default=85),
+        ),
+        flags=FlagSettings(
+            can_flag_admins=_as_bool(raw, "behaviour", "flags", "CAN_FLAG_ADMINS"),
+            filter_affects_admins=_as_bool(raw, "behaviour", "flags", "FILTER_AFFECTS_ADMINS"),
+            mute_time=_as_int(raw, "behaviour", "flags", "MUTE_TIME", default=900),
+            warn_dm=_as_str(raw, "behaviour", "flags", "WARN_DM"),
+            flag_limit=_as_int(raw, "behaviour", "flags", "FLAG_LIMIT", default=10),
+            review_channel=_as_int(raw, "behaviour", "flags", "review_channel"),
+        ),
+        roles=Roles(
+            verified=_as_int(raw, "roles", "verified_ID"),
+            lockdown=_as_int(raw, "roles", "lockdown_ID"),
+            mod=_as_int(raw, "roles", "mod_ID"),
+            bot_manager=_as_int(raw, "roles", "bot_manager_ID"),
+        ),
+        leveling=LevelingSettings(
+            channel_id=_as_int(raw, "LEVELING", "CHANNEL_ID"),
+            embed_title=_as_str(raw, "LEVELING", "EMBED", "title"),
+            embed_description=_as_str(raw, "LEVELING", "EMBED", "description"),
+            embed_field=_as_str(raw, "LEVELING", "EMBED", "field"),
+        ),
+        welcome=WelcomeSettings(
+            channel_id=_as_int(raw, "WELCOME", "WELCOME_CHANNEL_ID"),
+            welcome_message=_as_str(raw, "WELCOME", "WELCOME_MESSAGE", default="{user} joined"),
+            goodbye_message=_as_str(raw, "WELCOME", "GOODBYE_MESSAGE", default="{user} left"),
+            show_card_on_enter=_as_bool(raw, "WELCOME", "SHOW_CARD_ON_ENTER", default=True),
+            show_card_on_leave=_as_bool(raw, "WELCOME", "SHOW_CARD_ON_LEAVE", default=True),
+            banner_disk_cache=_as_bool(raw, "WELCOME", "BANNER_DISK_CACHE"),
+            raid_joins_per_second=_as_int(raw, "WELCOME", "RAID", "JOINS_PER_SECOND", default=3),
+            raid_window=_as_int(raw, "WELCOME", "RAID", "WINDOW", default=5),
+        ),
+    )
+
+_snapshot = _build_config(_config)
+
+def get_config() -> Config:
+    return _snapshot
+
+def reload_if_changed() -> bool:
+    """
+    Re-reads conf.yml if its mtime changed. The raw tree and the typed snapshot are
+    swapped together only after the new file parsed and validated, so readers never
+    see a half-loaded config. Returns True if a new config was applied.
+    """
+    global _config, _snapshot, _config_mtime
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        return False
+    if mtime == _config_mtime:
+        return False
+    try:
+        raw = _read_config_file()
+        snapshot = _build_config(raw)
+    except Exception as e:
+        print(f"[config] reload failed, keeping previous config: {e}")
+        _config_mtime = mtime
+        return False
+    _config, _snapshot, _config_mtime = raw, snapshot, mtime
+    return True
@@ -12,17 +12,15 @@ import signal
 from pathlib import Path
 import re
 from typing import Optional
-import aiohttp
-import tempfile
-import os
 
-from PerfectionBot.config.yamlHandler import get_value
+from PerfectionBot.config.yamlHandler import get_value, get_config, reload_if_changed
 from PerfectionBot.scripts.filter import check_bad
-from PerfectionBot.scripts import watchdog, yt, verify, bannergenerator
-from PerfectionBot.scripts.lockdown import initiate_lockdown, handle_confirm, handle_revoke
+from PerfectionBot.scripts import watchdog, yt, verify, welcome, httpclient, bannercache
+from PerfectionBot.scripts.lockdown import initiate_lockdown, claim_lockdown, handle_confirm, handle_revoke
 from PerfectionBot.scripts.log import log_to_channel
 from PerfectionBot.scripts import leveling
-from PerfectionBot.scripts.appeals import save_appeals, load_appeals
+from PerfectionBot.scripts.appeals import appeals, save_appeals, load_appeals, AppealScheduler
+from PerfectionBot.scripts.pipeline import MessagePipeline, PRIORITY_NORMAL, PRIORITY_LOW
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -57,8 +55,6 @@ banned_keywords: set[str] = set()
 BANNED_FILE = Path("banned-keywords.config")
 APPEALS_PATH = DATA_DIR / "appeals.json"
 
-appeals: dict[str, dict] = {}
-
 FLAGS_FILE = DATA_DIR / "flags.dat"
 XP_FILE = Path(leveling.FILE)
 xp_memory: dict[int, int] = {}
@@ -66,18 +62,20 @@ _xp_initialized = False
 _xp_lock = asyncio.Lock()
 
 def sys_enabled(name: str) -> bool:
-    try:
-        val = get_value("systems", name)
-        if isinstance(val, bool):
-            return val
-        if isinstance(val, (int, float)):
-            return bool(val)
-        if isinstance(val, str):
-            s = val.strip().lower()
-            return s in ("1", "true", "yes", "on", "y", "t")
-        return bool(val)
-    except Exception:
-        return False
+    return getattr(get_config().systems, name, False)
+
+_admin_role_ids: dict[int, set[int]] = {}
+
+def _rebuild_admin_roles(guild: discord.Guild) -> set[int]:
+    ids = {r.id for r in guild.roles if r.permissions.administrator}
+    _admin_role_ids[guild.id] = ids
+    return ids
+
+def _has_admin_role(member: discord.Member) -> bool:
+    ids = _admin_role_ids.get(member.guild.id)
+    if ids is None:
+        ids = _rebuild_admin_roles(member.guild)
+    return not ids.isdisjoint(r.id for r in member.roles)
 
 async def _run_with_semaphore(coros, limit=6):
     sem = asyncio.Semaphore(limit)
@@ -422,16 +420,17 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
 
     guild_id, user_id = message.guild.id, message.author.id
 
+    cfg = get_config()
     hit = None
-    if sys_enabled("filter"):
+    if cfg.systems.filter:
         try:
-            if any(r.permissions.administrator for r in message.author.roles) and not get_value("behaviour", "flags", "FILTER_AFFECTS_ADMINS"):
+            if not cfg.flags.filter_affects_admins and _has_admin_role(message.author):
                 return
         except Exception:
             pass
         hit = await bot.loop.run_in_executor(executor, check_bad, message.content)
 
-    if not hit and not is_edit and sys_enabled("leveling"):
+    if not hit and not is_edit and cfg.systems.leveling:
         try:
             prev_xp = await asyncio.to_thread(leveling.read_xp, user_id)
         except Exception:
@@ -460,16 +459,16 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
                 message.author.top_role.color if message.author.top_role else discord.Color.gold()
             )
 
-            chnl_id = get_value("LEVELING", "CHANNEL_ID")
+            chnl_id = cfg.leveling.channel_id
             chnl = bot.get_channel(int(chnl_id)) if chnl_id else None
             if chnl:
                 new_embed = discord.Embed(
-                    title=get_value("LEVELING", "EMBED", "title"),
-                    description=f"<@{user_id}> " + get_value("LEVELING", "EMBED", "description"),
+                    title=cfg.leveling.embed_title,
+                    description=f"<@{user_id}> " + cfg.leveling.embed_description,
                     color=get_level_role_color(message.author)
                 )
                 new_embed.add_field(
-                    name=get_value("LEVELING", "EMBED", "field"),
+                    name=cfg.leveling.embed_field,
                     value=f"**{prev_lvl}** -> **{lvl}**",
                     inline=False
                 )
@@ -513,7 +512,7 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
     try:
         content = message.content.replace("```", "´´´")
         prefix = "(Edited) " if is_edit else ""
-        tmpl = get_value("behaviour", "flags", "WARN_DM") + f"\n\n```{content}```"
+        tmpl = cfg.flags.warn_dm + f"\n\n```{content}```"
         dm_msg = await message.author.send(prefix + tmpl.format(word=flagged_word))
         await dm_msg.add_reaction("⚠️")
 
@@ -529,6 +528,7 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
             "review_by": None
         }
         save_appeals()
+        appeal_scheduler.schedule(str(dm_msg.id), appeals[str(dm_msg.id)])
     except Exception:
         create_task(log_to_channel(message.guild, f"❌ Warn DM failed", discord.Color.red(), "fail"))
 
@@ -536,7 +536,7 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
 
     if total_flags % 5 == 0:
         try:
-            t = int(get_value("behaviour", "flags", "MUTE_TIME"))
+            t = cfg.flags.mute_time
             until = datetime.now(timezone.utc) + timedelta(seconds=t)
             await message.author.timeout(until, reason="Flag multiple timeout")
             create_task(
@@ -550,12 +550,30 @@ async def handle_message_event(message, *, is_edit=False, before_msg=None):
         except Exception:
             create_task(log_to_channel(message.guild, f"❌ Timeout failed", discord.Color.red(), "fail"))
 
-    limit = int(get_value("behaviour", "flags", "FLAG_LIMIT"))
-    if total_flags >= limit:
+    limit = cfg.flags.flag_limit
+    if total_flags >= limit and claim_lockdown(guild_id, user_id):
         create_task(initiate_lockdown(message.guild, message.author, "flag_limit", "confirm"))
 
     _queue_flag_save(guild_id)
 
+message_pipeline = MessagePipeline(handle_message_event, workers=4, maxsize=1000)
+watchdog.register_metrics("Message pipeline", message_pipeline.stats)
+watchdog.register_metrics("Banner renders", welcome.render_pool.stats)
+watchdog.register_metrics("Banner cache", bannercache.stats)
+watchdog.register_metrics("Greetings", welcome.aggregator.stats)
+watchdog.register_metrics("YouTube", yt.poll_scheduler.stats)
+watchdog.register_metrics("YouTube API", yt.api_metrics.stats)
+watchdog.register_metrics("HTTP client", httpclient.stats)
+
+def _message_priority(message: discord.Message, is_edit: bool) -> int:
+    if is_edit:
+        return PRIORITY_LOW
+    ch = message.channel
+    name = getattr(ch, "name", None) or ""
+    if ch.id == get_config().log_id or name == "bot-mem" or name.startswith("lockdown-"):
+        return PRIORITY_LOW
+    return PRIORITY_NORMAL
+
 @tasks.loop(seconds=60)
 async def push_xp_to_mem():
     if not sys_enabled("leveling"):
@@ -588,6 +606,14 @@ async def push_flags_to_mem():
     if coros:
         await _run_with_semaphore(coros, limit=6)
 
+@tasks.loop(seconds=30)
+async def reload_config_task():
+    try:
+        if await asyncio.to_thread(reload_if_changed):
+            print("[reload_config_task] conf.yml changed, config reloaded")
+    except Exception as e:
+        print(f"[reload_config_task] failed: {e}")
+
 @tasks.loop(seconds=60)
 async def reload_banned_keywords_task():
     if not sys_enabled("filter"):
@@ -607,30 +633,20 @@ async def monitor_lag():
     if delay > 0.1:
         print(f"⚠️ Event loop lag detected: {delay:.3f}s")
 
-@tasks.loop(minutes=1)
-async def appeal_timeouts():
-    now = datetime.now(timezone.utc)
-    for dm_msg_id, appeal in list(appeals.items()):
-        if appeal.get("status") == "appealed":
-            try:
-                review_time = datetime.fromisoformat(appeal.get("review_time"))
-            except Exception:
-                review_time = None
-            if not review_time:
-                continue
-            if now - review_time > timedelta(hours=24):
-                appeal["status"] = "timed_out"
-                appeal["review_time"] = now.isoformat()
-                appeals[dm_msg_id] = appeal
-                save_appeals()
-                try:
-                    uobj = await bot.fetch_user(appeal["user_id"])
-                    await uobj.send("⏳ No moderator reviewed your appeal within 24 hours — appeal timed out.")
-                except Exception:
-                    pass
-                gobj = bot.get_guild(appeal.get("guild_id"))
-                if gobj:
-                    create_task(log_to_channel(gobj, f"⚪ Appeal timed out for <@{appeal['user_id']}>", discord.Color.dark_grey(), "info"))
+async def _on_appeals_expired(expired):
+    for dm_msg_id, appeal, kind in expired:
+        if kind != "review":
+            continue
+        try:
+            uobj = await bot.fetch_user(appeal["user_id"])
+            await uobj.send("⏳ No moderator reviewed your appeal within 24 hours — appeal timed out.")
+        except Exception:
+            pass
+        gobj = bot.get_guild(appeal.get("guild_id"))
+        if gobj:
+            create_task(log_to_channel(gobj, f"⚪ Appeal timed out for <@{appeal['user_id']}>", discord.Color.dark_grey(), "info"))
+
+appeal_scheduler = AppealScheduler(on_expired=_on_appeals_expired)
 
 watchdog_group = app_commands.Group(name="watchdog", description="Watchdog commands")
 
@@ -716,6 +732,9 @@ async def on_ready():
     except Exception as e:
         print(f"[on_ready] starting watchdog monitoring failed: {e}")
 
+    for guild in bot.guilds:
+        _rebuild_admin_roles(guild)
+
     coros = []
     for guild in bot.guilds:
         coros.append(_ensure_channels(guild))
@@ -763,10 +782,20 @@ async def on_ready():
     except Exception as e:
         print(f"[on_ready] starting yt.monitor_channel failed: {e}")
 
+    message_pipeline.start()
+
+    welcome_cfg = get_config().welcome
+    if sys_enabled("welcome") and (welcome_cfg.show_card_on_enter or welcome_cfg.show_card_on_leave):
+        try:
+            await welcome.render_pool.warm_up()
+        except Exception as e:
+            print(f"[on_ready] banner template warm-up failed: {e}")
+
     try:
         flush_flag_saves.start()
         monitor_lag.start()
         push_flags_to_mem.start()
+        reload_config_task.start()
 
         if sys_enabled("filter"):
             reload_banned_keywords_task.start()
@@ -774,7 +803,8 @@ async def on_ready():
         if sys_enabled("leveling"):
             push_xp_to_mem.start()
 
-        appeal_timeouts.start()
+        appeal_scheduler.rebuild()
+        appeal_scheduler.start()
     except Exception as e:
         print(f"[on_ready] starting tasks failed: {e}")
 
@@ -806,106 +836,42 @@ async def on_ready():
     except Exception as e:
         print(f"[on_ready] sync logic failed: {e}")
 
-async def fetchProfIcon(member: discord.Member) -> str:
-    avatar_url = member.avatar.url if member.avatar else member.default_avatar.url
-    file_ext = avatar_url.split('.')[-1]
-    temp_dir = tempfile.gettempdir()
-    temp_file_path = os.path.join(temp_dir, f"{member.id}.{file_ext}")
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(avatar_url) as resp:
-            if resp.status == 200:
-                with open(temp_file_path, 'wb') as f:
-                    f.write(await resp.read())
-                return temp_file_path
-            else:
-                return None
-            
-def safe_remove(path):
-    if path and os.path.exists(path):
-        os.remove(path)
-
 @bot.event
-async def on_member_join(member):
-    if not get_value("systems", "welcome"):
-        return
-
-    avatar_path = None
-    banner_path = None
-
-    try:
-        avatar_path = await fetchProfIcon(member)
-        if not avatar_path:
-            return
-
-        banner_path = os.path.join(
-            tempfile.gettempdir(),
-            f"{member.id}_welcome.png"
-        )
+async def on_guild_join(guild: discord.Guild):
+    _rebuild_admin_roles(guild)
 
-        bannergenerator.generate_banner(
-            "Welcome",
-            str(member),
-            avatar_path,
-            banner_path
-        )
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    _admin_role_ids.pop(guild.id, None)
 
-        CHNL_ID = int(get_value("WELCOME", "WELCOME_CHANNEL_ID"))
-        msg = get_value("WELCOME", "WELCOME_MESSAGE").replace(
-            "{user}", member.mention
-        )
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    if role.permissions.administrator:
+        _admin_role_ids.setdefault(role.guild.id, set()).add(role.id)
 
-        channel = bot.get_channel(CHNL_ID) or await bot.fetch_channel(CHNL_ID)
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    _admin_role_ids.get(role.guild.id, set()).discard(role.id)
 
-        await channel.send(
-            content=msg,
-            file=discord.File(banner_path)
-        )
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    ids = _admin_role_ids.setdefault(after.guild.id, set())
+    if after.permissions.administrator:
+        ids.add(after.id)
+    else:
+        ids.discard(after.id)
 
-    finally:
-        safe_remove(avatar_path)
-        safe_remove(banner_path)
+@bot.event
+async def on_member_join(member):
+    if not sys_enabled("welcome"):
+        return
+    await welcome.aggregator.handle(bot, member, joined=True)
 
 @bot.event
 async def on_member_remove(member):
-    if not get_value("systems", "welcome"):
+    if not sys_enabled("welcome"):
         return
-    
-    avatar_path = None
-    banner_path = None
-
-    try:
-        avatar_path = await fetchProfIcon(member)
-        if not avatar_path:
-            return
-
-        banner_path = os.path.join(
-            tempfile.gettempdir(),
-            f"{member.id}_goodbye.png"
-        )
-
-        bannergenerator.generate_banner(
-            "Goodbye",
-            str(member),
-            avatar_path,
-            banner_path
-        )
-
-        CHNL_ID = int(get_value("WELCOME", "WELCOME_CHANNEL_ID"))
-        msg = get_value("WELCOME", "GOODBYE_MESSAGE").replace(
-            "{user}", member.mention
-        )
-
-        channel = bot.get_channel(CHNL_ID) or await bot.fetch_channel(CHNL_ID)
-
-        await channel.send(
-            content=msg,
-            file=discord.File(banner_path)
-        )
-
-    finally:
-        safe_remove(avatar_path)
-        safe_remove(banner_path)
+    await welcome.aggregator.handle(bot, member, joined=False)
 
 @bot.event
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
@@ -915,21 +881,19 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
         ap = appeals.get(str(payload.message_id))
         if not ap:
             return
-        if ap.get("status") != "warned":
+        if ap.get("status") not in ("warned", "expired"):
             return
         if ap.get("user_id") != payload.user_id:
             return
         if str(payload.emoji) != "⚠️":
             return
-        try:
-            warn_time = datetime.fromisoformat(ap["warn_time"])
-        except Exception:
-            warn_time = None
-        if warn_time and datetime.now(timezone.utc) - warn_time > timedelta(hours=24):
+        if ap.get("status") == "expired" or appeal_scheduler.is_expired(str(payload.message_id)):
+            # terminal: later ⚠️ reactions on this DM are ignored
             ap["status"] = "timed_out"
             ap["review_time"] = datetime.now(timezone.utc).isoformat()
             appeals[str(payload.message_id)] = ap
             save_appeals()
+            appeal_scheduler.schedule(str(payload.message_id), ap)
             try:
                 user_obj = await bot.fetch_user(ap["user_id"])
                 await user_obj.send("❌ Appeal failed: appeal window of 24 hours has expired.")
@@ -940,7 +904,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
         if not guild:
             return
         try:
-            review_ch_id = int(get_value("behaviour", "flags", "review_channel"))
+            review_ch_id = get_config().flags.review_channel
         except Exception:
             review_ch_id = None
         review_ch = guild.get_channel(review_ch_id) if review_ch_id else None
@@ -974,6 +938,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
         ap["review_by"] = None
         appeals[str(payload.message_id)] = ap
         save_appeals()
+        appeal_scheduler.schedule(str(payload.message_id), ap)
         try:
             user_obj = await bot.fetch_user(orig_user)
             await user_obj.send("✅ Your appeal was submitted to moderators for review.")
@@ -1015,6 +980,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
             ap["review_time"] = datetime.now(timezone.utc).isoformat()
             appeals[dm_msg_id] = ap
             save_appeals()
+            appeal_scheduler.schedule(dm_msg_id, ap)
             try:
                 await _save_flags(bot.get_guild(gm))
             except Exception:
@@ -1032,6 +998,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
             ap["review_time"] = datetime.now(timezone.utc).isoformat()
             appeals[dm_msg_id] = ap
             save_appeals()
+            appeal_scheduler.schedule(dm_msg_id, ap)
             try:
                 uobj = await bot.fetch_user(ap["user_id"])
                 await uobj.send("❌ Your appeal was rejected by moderators.")
@@ -1042,16 +1009,31 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
 
 @bot.event
 async def on_message(message: discord.Message):
-    create_task(handle_message_event(message, is_edit=False))
+    if yt.is_own_pin_notice(message, bot.user):
+        try:
+            await message.delete()
+        except Exception as e:
+            print(f"[on_message] deleting pin notice failed: {e}")
+        return
+    if not message.author.bot and message.guild:
+        message_pipeline.submit(message, _message_priority(message, False), is_edit=False)
     await bot.process_commands(message)
 
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    yt.announcement_index.on_message_delete(payload.channel_id, payload.message_id)
+
+@bot.event
+async def on_guild_channel_pins_update(channel, last_pin):
+    yt.announcement_index.on_pins_update(channel.id)
+
 @bot.event
 async def on_message_edit(before: discord.Message, after: discord.Message):
     if after.author.bot or not after.guild:
         return
     if getattr(before, "content", None) == getattr(after, "content", None):
         return
-    create_task(handle_message_event(after, is_edit=True, before_msg=before))
+    message_pipeline.submit(after, _message_priority(after, True), is_edit=True, before_msg=before)
 
 class CtxWrapper:
     def __init__(self, interaction: discord.Interaction):
@@ -1618,6 +1600,7 @@ def get_level_role_color(member: discord.Member) -> discord.Color:
 
 async def main():
     await asyncio.to_thread(load_appeals)
+    httpclient.get_session()
     token = get_value("tokens", "bot")
     if not token:
         print("Bot token missing in config; exiting.")
@@ -1625,6 +1608,18 @@ async def main():
     await bot.start(token)
 
 async def shutdown():
+    try:
+        await message_pipeline.stop()
+    except Exception:
+        pass
+    try:
+        welcome.render_pool.shutdown()
+    except Exception:
+        pass
+    try:
+        await httpclient.close()
+    except Exception:
+        pass
     try:
         await bot.close()
     except Exception:
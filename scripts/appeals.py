@@ -1,6 +1,10 @@
 # PerfectionBot/scripts/appeals.py
 
+import asyncio
+import heapq
 import json
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -8,6 +12,7 @@ DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 APPEALS_PATH = DATA_DIR / "appeals.json"
+APPEAL_WINDOW = timedelta(hours=24)
 
 appeals: dict[str, dict] = {}
 
@@ -19,13 +24,155 @@ def save_appeals():
         print(f"Failed to save appeals.json: {e}")
 
 def load_appeals():
-    global appeals
+    # mutate in place so modules holding a reference to `appeals` see the loaded data
     try:
         if APPEALS_PATH.exists():
             with APPEALS_PATH.open("r", encoding="utf-8") as f:
-                appeals = json.load(f)
+                data = json.load(f)
         else:
-            appeals = {}
+            data = {}
     except Exception as e:
         print(f"Failed to load appeals.json: {e}")
-        appeals = {}
\ No newline at end of file
+        data = {}
+    appeals.clear()
+    appeals.update(data)
+
+def _parse_ts(raw) -> float | None:
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(raw)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _deadline_for(appeal: dict) -> tuple[str, float] | None:
+    status = appeal.get("status")
+    if status == "warned":
+        start = _parse_ts(appeal.get("warn_time"))
+        kind = "warn"
+    elif status == "appealed":
+        start = _parse_ts(appeal.get("review_time"))
+        kind = "review"
+    else:
+        return None
+    if start is None:
+        return None
+    return kind, start + APPEAL_WINDOW.total_seconds()
+
+class AppealScheduler:
+    """
+    Min-heap of appeal deadlines. Sleeps until the earliest one and expires
+    everything due in a single batch with one save_appeals() call.
+
+    Two deadlines are tracked per appeal:
+      warn   - 24h window for the user to react to the warn DM (status -> "expired")
+      review - 24h window for moderators to review an appeal (status -> "timed_out")
+
+    `on_expired` is awaited with a list of (dm_msg_id, appeal, kind) after the batch is saved.
+    """
+
+    def __init__(self, on_expired=None):
+        self._heap: list[tuple[float, str, str]] = []
+        self._deadlines: dict[str, tuple[str, float]] = {}
+        self._on_expired = on_expired
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def rebuild(self):
+        self._heap = []
+        self._deadlines = {}
+        for dm_msg_id, appeal in appeals.items():
+            entry = _deadline_for(appeal)
+            if entry:
+                self._deadlines[dm_msg_id] = entry
+                self._heap.append((entry[1], dm_msg_id, entry[0]))
+        heapq.heapify(self._heap)
+        self._notify()
+
+    def schedule(self, dm_msg_id: str, appeal: dict):
+        entry = _deadline_for(appeal)
+        if entry is None:
+            self._deadlines.pop(dm_msg_id, None)
+            return
+        self._deadlines[dm_msg_id] = entry
+        heapq.heappush(self._heap, (entry[1], dm_msg_id, entry[0]))
+        if self._heap[0][1] == dm_msg_id:
+            self._notify()
+
+    def is_expired(self, dm_msg_id: str, now: float | None = None) -> bool:
+        entry = self._deadlines.get(dm_msg_id)
+        if not entry:
+            return False
+        return (now if now is not None else time.time()) >= entry[1]
+
+    def pending(self) -> int:
+        return len(self._deadlines)
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _is_current(self, ts: float, dm_msg_id: str, kind: str) -> bool:
+        return self._deadlines.get(dm_msg_id) == (kind, ts)
+
+    def _pop_due(self, now: float) -> list[tuple[str, str]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, dm_msg_id, kind = heapq.heappop(self._heap)
+            if self._is_current(ts, dm_msg_id, kind):
+                del self._deadlines[dm_msg_id]
+                due.append((dm_msg_id, kind))
+        return due
+
+    async def _run(self):
+        while True:
+            while self._heap and not self._is_current(*self._heap[0]):
+                heapq.heappop(self._heap)
+
+            self._wake.clear()
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._expire_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[AppealScheduler] expiring batch failed: {e}")
+
+    async def _expire_batch(self):
+        now = time.time()
+        now_iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        expired = []
+        for dm_msg_id, kind in self._pop_due(now):
+            appeal = appeals.get(dm_msg_id)
+            if not appeal:
+                continue
+            appeal["status"] = "expired" if kind == "warn" else "timed_out"
+            appeal["review_time"] = now_iso
+            expired.append((dm_msg_id, appeal, kind))
+
+        if not expired:
+            return
+        save_appeals()
+        if self._on_expired:
+            await self._on_expired(expired)
@@ -0,0 +1,142 @@
+# PerfectionBot/scripts/bannercache.py
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = DATA_DIR / "banner-cache"
+
+
+class LRUCache:
+    """
+    Bounded in-memory LRU of bytes values (by entry count and total size) with an
+    optional disk tier. get()/put() only touch memory; fetch()/store() also go to
+    disk, off the event loop.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int,
+                 disk_dir: Path | None = None, max_disk_files: int = 500):
+        self.name = name
+        self._entries: OrderedDict = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._disk_dir = disk_dir
+        self._max_disk_files = max_disk_files
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def set_disk_dir(self, disk_dir: Path | None):
+        self._disk_dir = disk_dir
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value: bytes):
+        if len(value) > self._max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._entries and (len(self._entries) > self._max_entries or self._size > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def fetch(self, key):
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self._disk_dir is not None:
+            value = await asyncio.to_thread(self._disk_read, key)
+            if value is not None:
+                self.disk_hits += 1
+                self.put(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def store(self, key, value: bytes):
+        self.put(key, value)
+        if self._disk_dir is not None:
+            await asyncio.to_thread(self._disk_write, key, value)
+
+    def _disk_path(self, key) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self._disk_dir / f"{self.name}-{digest}.bin"
+
+    def _disk_read(self, key):
+        try:
+            path = self._disk_path(key)
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[bannercache] disk read failed: {e}")
+            return None
+
+    def _disk_write(self, key, value: bytes):
+        try:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            path = self._disk_path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(value)
+            os.replace(tmp, path)
+            self._prune_disk()
+        except Exception as e:
+            print(f"[bannercache] disk write failed: {e}")
+
+    def _prune_disk(self):
+        files = list(self._disk_dir.glob(f"{self.name}-*.bin"))
+        if len(files) <= self._max_disk_files:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:len(files) - self._max_disk_files]:
+            try:
+                path.unlink()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+# avatar hash -> raw avatar bytes
+avatars = LRUCache("avatar", max_entries=256, max_bytes=32 * 1024 * 1024)
+# (avatar hash, greeting, user text, template version) -> PNG bytes
+banners = LRUCache("banner", max_entries=128, max_bytes=64 * 1024 * 1024)
+
+
+def configure(disk_enabled: bool):
+    disk_dir = CACHE_DIR if disk_enabled else None
+    avatars.set_disk_dir(disk_dir)
+    banners.set_disk_dir(disk_dir)
+
+
+def stats() -> dict:
+    a, b = avatars.stats(), banners.stats()
+    return {
+        "avatar_hits": a["hits"] + a["disk_hits"],
+        "avatar_misses": a["misses"],
+        "banner_hits": b["hits"] + b["disk_hits"],
+        "banner_misses": b["misses"],
+        "memory_bytes": a["bytes"] + b["bytes"],
+    }
@@ -2,9 +2,11 @@
 
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import numpy as np
-from collections import Counter
+import io
 import os
 import math
+import threading
+import time
 from typing import Tuple, Optional
 
 GRADIENT_WIDTH = 1100
@@ -25,18 +27,29 @@ RING_PATH = os.path.join(ASSETS_DIR, "ring.png")
 PLACEHOLDER_COLOR = (0, 255, 38)
 EXPAND_PIXELS = 5
 
+# bump whenever the rendered output changes so cached banners are not reused
+TEMPLATE_VERSION = 1
+
 def get_two_dominant_colors(image: Image.Image, resize: int = 100) -> Tuple[Tuple[int,int,int], Tuple[int,int,int]]:
     img = image.convert("RGB")
     small = img.resize((max(1, min(resize, img.width)), max(1, min(resize, img.height))))
-    pixels = np.array(small).reshape(-1, 3)
-    pixels = (pixels // 32) * 32
-    counts = Counter(map(tuple, pixels))
-    most_common = counts.most_common(2)
-    if not most_common:
+    q = np.asarray(small, dtype=np.uint8).reshape(-1, 3) >> 5
+    if not len(q):
         return (128,128,128), (64,64,64)
-    if len(most_common) == 1:
-        return most_common[0][0], most_common[0][0]
-    return most_common[0][0], most_common[1][0]
+    # pack the 3-bit quantised channels into one 9-bit code per pixel
+    codes = (q[:, 0].astype(np.int32) << 6) | (q[:, 1].astype(np.int32) << 3) | q[:, 2]
+    uniq, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    # most frequent first, ties broken by first appearance (same order as Counter.most_common)
+    order = np.lexsort((first, -counts))[:2]
+
+    def unpack(code):
+        code = int(code)
+        return ((code >> 6) & 7) * 32, ((code >> 3) & 7) * 32, (code & 7) * 32
+
+    top = [unpack(uniq[i]) for i in order]
+    if len(top) == 1:
+        return top[0], top[0]
+    return top[0], top[1]
 
 def luminance(color: Tuple[int,int,int]) -> float:
     r, g, b = color
@@ -50,17 +63,31 @@ def darken(color: Tuple[int,int,int], factor: float) -> Tuple[int,int,int]:
     )
 
 def generate_vertical_gradient(width: int, height: int, top_color: Tuple[int,int,int], bottom_color: Tuple[int,int,int]) -> Image.Image:
-    gradient = np.zeros((height, width, 3), dtype=np.uint8)
-    for y in range(height):
-        t = y / max(1, height - 1)
-        color = (
-            int(top_color[0] * (1 - t) + bottom_color[0] * t),
-            int(top_color[1] * (1 - t) + bottom_color[1] * t),
-            int(top_color[2] * (1 - t) + bottom_color[2] * t)
-        )
-        gradient[y, :] = color
+    t = (np.arange(height, dtype=np.float64) / max(1, height - 1))[:, None]
+    column = (np.array(top_color, dtype=np.float64) * (1 - t) + np.array(bottom_color, dtype=np.float64) * t).astype(np.uint8)
+    gradient = np.ascontiguousarray(np.broadcast_to(column[:, None, :], (height, width, 3)))
     return Image.fromarray(gradient)
 
+def _blur_is_noop(height: int, top_color: Tuple[int,int,int], bottom_color: Tuple[int,int,int], radius: float) -> bool:
+    # A Gaussian blur leaves a linear vertical ramp unchanged except where the kernel is clamped
+    # at the top/bottom edge, and there the error is a fraction of (per-row step * radius).
+    # Under 2 levels that rounds to at most 1 level per channel, i.e. invisible.
+    step = max(abs(a - b) for a, b in zip(top_color, bottom_color)) / max(1, height - 1)
+    return step * radius < 2
+
+def render_background(width: int, height: int, top_color: Tuple[int,int,int], bottom_color: Tuple[int,int,int],
+                      blur_radius: float = BLUR_RADIUS) -> Image.Image:
+    if blur_radius and not _blur_is_noop(height, top_color, bottom_color, blur_radius):
+        gradient = generate_vertical_gradient(width, height, top_color, bottom_color)
+        return gradient.filter(ImageFilter.GaussianBlur(radius=blur_radius)).convert("RGBA")
+
+    # render a single RGBA column analytically and stretch it sideways
+    t = (np.arange(height, dtype=np.float64) / max(1, height - 1))[:, None]
+    column = np.empty((height, 1, 4), dtype=np.uint8)
+    column[:, 0, :3] = (np.array(top_color, dtype=np.float64) * (1 - t) + np.array(bottom_color, dtype=np.float64) * t).astype(np.uint8)
+    column[:, 0, 3] = 255
+    return Image.fromarray(column, mode="RGBA").resize((width, height), Image.NEAREST)
+
 def load_font_path_safe(path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
     if path and os.path.exists(path):
         try:
@@ -73,33 +100,60 @@ def load_font_path_safe(path: Optional[str], size: int) -> ImageFont.FreeTypeFon
         print("Failed to load default font, using PIL default.")
         return ImageFont.load_default()
 
+MIN_FONT_SIZE = 10
+_MEASURE_CACHE_LIMIT = 4096
+_measure_cache: dict[tuple, Tuple[int,int]] = {}
+
+def _measure(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont,
+             font_path: Optional[str], size: int) -> Tuple[int,int]:
+    key = (font_path, size, text)
+    cached = _measure_cache.get(key)
+    if cached is not None:
+        return cached
+    stroke_width = max(1, size // 24)
+    try:
+        bbox = draw.textbbox((0, 0), text, font=font, stroke_width=stroke_width)
+    except TypeError:
+        bbox = draw.textbbox((0, 0), text, font=font)
+    result = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+    if len(_measure_cache) >= _MEASURE_CACHE_LIMIT:
+        _measure_cache.clear()
+    _measure_cache[key] = result
+    return result
+
 def compute_font_and_bbox(image: Image.Image, text: str, font_path: Optional[str] = None,
                           max_width: Optional[int] = None, max_height: Optional[int] = None,
-                          start_scale: float = FONT_SIZE_SCALE):
+                          start_scale: float = FONT_SIZE_SCALE, template: Optional["BannerTemplate"] = None):
+    # Largest size in [MIN_FONT_SIZE, start] whose text fits, found by bisection over cached
+    # fonts and memoised measurements (falls back to MIN_FONT_SIZE if nothing fits).
+    template = template or get_template()
     draw = ImageDraw.Draw(image)
-    font_size = max(24, int(image.width * start_scale))
-    min_font_size = 10
+    start_size = max(24, int(image.width * start_scale))
     if max_width is None:
         max_width = image.width - 2 * TEXT_PADDING
     if max_height is None:
         max_height = image.height - 2 * TEXT_PADDING
-    font = load_font_path_safe(font_path, font_size)
-    stroke_width = max(1, font_size // 24)
-    while True:
-        try:
-            bbox = draw.textbbox((0, 0), text, font=font, stroke_width=stroke_width)
-        except TypeError:
-            bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        if text_width <= max_width and text_height <= max_height:
-            break
-        if font_size <= min_font_size:
-            break
-        font_size -= 1
-        stroke_width = max(1, font_size // 24)
-        font = load_font_path_safe(font_path, font_size)
-    return font, stroke_width, text_width, text_height
+
+    def fits(size):
+        w, h = _measure(draw, text, template.font(size, font_path), font_path, size)
+        return w <= max_width and h <= max_height
+
+    if fits(start_size):
+        font_size = start_size
+    else:
+        lo, hi = MIN_FONT_SIZE, start_size - 1
+        font_size = MIN_FONT_SIZE
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            if fits(mid):
+                font_size = mid
+                lo = mid + 1
+            else:
+                hi = mid - 1
+
+    font = template.font(font_size, font_path)
+    text_width, text_height = _measure(draw, text, font, font_path, font_size)
+    return font, max(1, font_size // 24), text_width, text_height
 
 def draw_text_at(image: Image.Image, text: str, font: ImageFont.FreeTypeFont, stroke_width: int, x: int, y: int):
     draw = ImageDraw.Draw(image)
@@ -129,26 +183,96 @@ def cover_resize_and_crop(src_img: Image.Image, target_size: Tuple[int,int]) ->
     bottom = top + target_h
     return resized.crop((left, top, right, bottom))
 
-def load_ring_safe() -> Optional[Image.Image]:
-    if os.path.exists(RING_PATH):
+def load_ring_safe(path: str = RING_PATH) -> Optional[Image.Image]:
+    if os.path.exists(path):
         try:
-            return Image.open(RING_PATH).convert("RGBA")
+            return Image.open(path).convert("RGBA")
         except Exception:
-            print(f"Failed to open ring image at {RING_PATH}")
+            print(f"Failed to open ring image at {path}")
             return None
     else:
-        print(f"Ring image not found at {RING_PATH}")
+        print(f"Ring image not found at {path}")
         return None
 
-def paste_ring_and_profile(gradient: Image.Image, profile_path: str,
-    placeholder_color: Tuple[int,int,int] = PLACEHOLDER_COLOR):
-    ring = load_ring_safe()
+class BannerTemplate:
+    """
+    Everything a banner needs that doesn't depend on the member: the decoded ring,
+    the placeholder mask and its bbox, the ring overlay with the placeholder cut out,
+    and a font cache. Built once and shared by every render.
+    """
+
+    def __init__(self, ring_path: str = RING_PATH, font_path: Optional[str] = FONT_PATH,
+                 placeholder_color: Tuple[int,int,int] = PLACEHOLDER_COLOR):
+        self.placeholder_color = placeholder_color
+        self.font_path = font_path if font_path and os.path.exists(font_path) else None
+        self.ring = load_ring_safe(ring_path)
+        self.bbox = None
+        self.bbox_mask = None
+        self.overlay = self.ring
+        # FreeType faces aren't safe to share between render threads, so fonts are cached per thread
+        self._fonts = threading.local()
+        if self.ring is not None:
+            self._prepare_ring()
+
+    def _prepare_ring(self):
+        arr = np.array(self.ring)
+        match_mask = np.all(arr[:, :, :3] == np.array(self.placeholder_color, dtype=np.uint8), axis=2)
+        if not match_mask.any():
+            return
+
+        ys, xs = np.where(match_mask)
+        min_x = max(0, int(xs.min()) - EXPAND_PIXELS)
+        max_x = min(arr.shape[1], int(xs.max()) + 1 + EXPAND_PIXELS)
+        min_y = max(0, int(ys.min()) - EXPAND_PIXELS)
+        max_y = min(arr.shape[0], int(ys.max()) + 1 + EXPAND_PIXELS)
+        self.bbox = (min_x, min_y, max_x, max_y)
+
+        mask_img = Image.fromarray(match_mask.astype('uint8') * 255, mode="L")
+        self.bbox_mask = mask_img.crop(self.bbox)
+
+        try:
+            arr[:, :, 3][match_mask] = 0
+            self.overlay = Image.fromarray(arr, mode="RGBA")
+        except Exception as e:
+            print(f"Failed to cut placeholder out of ring: {e}")
+
+    def font(self, size: int, path: Optional[str] = None) -> ImageFont.FreeTypeFont:
+        cache = getattr(self._fonts, "cache", None)
+        if cache is None:
+            cache = self._fonts.cache = {}
+        key = (path, size)
+        font = cache.get(key)
+        if font is None:
+            font = cache[key] = load_font_path_safe(path, size)
+        return font
+
+_templates: dict[Tuple[int,int,int], BannerTemplate] = {}
+_templates_lock = threading.Lock()
+
+def get_template(placeholder_color: Tuple[int,int,int] = PLACEHOLDER_COLOR) -> BannerTemplate:
+    template = _templates.get(placeholder_color)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(placeholder_color)
+            if template is None:
+                template = _templates[placeholder_color] = BannerTemplate(placeholder_color=placeholder_color)
+    return template
+
+def _open_profile(profile) -> Image.Image:
+    src = profile if isinstance(profile, Image.Image) else Image.open(profile)
+    return src.convert("RGBA")
+
+def paste_ring_and_profile(gradient: Image.Image, profile_path,
+    placeholder_color: Tuple[int,int,int] = PLACEHOLDER_COLOR, template: Optional[BannerTemplate] = None):
+    # profile_path may be a path, a file-like object or an already decoded Image
+    template = template or get_template(placeholder_color)
+    ring = template.ring
     ring_x = (gradient.width - ring.width) // 2 if ring else 0
     ring_y = (gradient.height - ring.height) // 2 if ring else 0
 
     if ring is None:
         try:
-            src = Image.open(profile_path).convert("RGBA")
+            src = _open_profile(profile_path)
             profile_size = (200, 200)
             filled_src = cover_resize_and_crop(src, profile_size)
             profile_x = (gradient.width - profile_size[0]) // 2
@@ -158,76 +282,62 @@ def paste_ring_and_profile(gradient: Image.Image, profile_path: str,
             print(f"Failed to load profile image {profile_path}: {e}")
         return
 
-    arr = np.array(ring)
-    rgb_arr = arr[:, :, :3]
-    match_mask = np.all(rgb_arr == np.array(placeholder_color, dtype=np.uint8), axis=2)
-
-    if not match_mask.any():
+    if template.bbox is None:
         gradient.paste(ring, (ring_x, ring_y), ring)
         return
 
-    ys, xs = np.where(match_mask)
-    min_x = max(0, int(xs.min()) - EXPAND_PIXELS)
-    max_x = min(arr.shape[1], int(xs.max()) + 1 + EXPAND_PIXELS)
-    min_y = max(0, int(ys.min()) - EXPAND_PIXELS)
-    max_y = min(arr.shape[0], int(ys.max()) + 1 + EXPAND_PIXELS)
-    bbox_w = max_x - min_x
-    bbox_h = max_y - min_y
+    min_x, min_y, max_x, max_y = template.bbox
 
     try:
-        src = Image.open(profile_path).convert("RGBA")
+        src = _open_profile(profile_path)
     except Exception as e:
         print(f"Failed to open profile image {profile_path}: {e}")
         gradient.paste(ring, (ring_x, ring_y), ring)
         return
 
-    filled_src = cover_resize_and_crop(src, (bbox_w, bbox_h))
-
-    mask_full = (match_mask.astype('uint8') * 255)
-    mask_img = Image.fromarray(mask_full, mode="L")
-    bbox_mask = mask_img.crop((min_x, min_y, max_x, max_y))
-
-    paste_x = ring_x + min_x
-    paste_y = ring_y + min_y
+    filled_src = cover_resize_and_crop(src, (max_x - min_x, max_y - min_y))
 
     try:
-        gradient.paste(filled_src, (paste_x, paste_y), bbox_mask)
+        gradient.paste(filled_src, (ring_x + min_x, ring_y + min_y), template.bbox_mask)
     except Exception as e:
         print(f"Failed to paste profile into gradient: {e}")
 
-    try:
-        if arr.shape[2] == 4:
-            alpha = arr[:, :, 3].copy()
-            alpha[match_mask] = 0
-            arr[:, :, 3] = alpha
-        else:
-            alpha = np.full((arr.shape[0], arr.shape[1]), 255, dtype=np.uint8)
-            alpha[match_mask] = 0
-            arr = np.dstack((arr[:, :, :3], alpha))
-        ring_no_green = Image.fromarray(arr, mode="RGBA")
-        gradient.paste(ring_no_green, (ring_x, ring_y), ring_no_green)
-    except Exception as e:
-        gradient.paste(ring, (ring_x, ring_y), ring)
+    gradient.paste(template.overlay, (ring_x, ring_y), template.overlay)
+
+def render_banner(welcome_text: str, user_text: str, avatar_bytes: bytes, timings: Optional[dict] = None) -> bytes:
+    # bytes in, PNG bytes out; `timings`, if given, is filled with per-stage durations in ms
+    stage_start = time.perf_counter()
 
-def main(welcome_text: str, user_text: str, input_path: str, output_path: str):
-    image = Image.open(input_path)
+    def mark(stage):
+        nonlocal stage_start
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = (now - stage_start) * 1000
+        stage_start = now
+
+    image = Image.open(io.BytesIO(avatar_bytes))
+    image.load()
+    mark("decode")
     c1, c2 = get_two_dominant_colors(image)
     light, dark = (c1, c2) if luminance(c1) > luminance(c2) else (c2, c1)
     light = darken(light, DARKEN_FACTOR)
     dark = darken(dark, DARKEN_FACTOR)
-    gradient = generate_vertical_gradient(GRADIENT_WIDTH, GRADIENT_HEIGHT, top_color=light, bottom_color=dark)
-    gradient = gradient.filter(ImageFilter.GaussianBlur(radius=BLUR_RADIUS)).convert("RGBA")
+    mark("colors")
+    gradient = render_background(GRADIENT_WIDTH, GRADIENT_HEIGHT, light, dark)
+    mark("background")
 
-    paste_ring_and_profile(gradient, input_path, placeholder_color=PLACEHOLDER_COLOR)
+    template = get_template()
+    paste_ring_and_profile(gradient, image, template=template)
+    mark("ring")
 
-    user_font, user_stroke, user_w, user_h = compute_font_and_bbox(gradient, user_text, font_path=None)
+    user_font, user_stroke, user_w, user_h = compute_font_and_bbox(gradient, user_text, font_path=None, template=template)
     user_x = (gradient.width - user_w) // 2
     user_y = gradient.height - user_h - TEXT_PADDING - 10
 
     fixed_greeting_y = int(gradient.height * 0.62)
     draw = ImageDraw.Draw(gradient)
     welcome_font_size = max(24, int(gradient.width * FONT_SIZE_SCALE))
-    welcome_font = load_font_path_safe(FONT_PATH if os.path.exists(FONT_PATH) else None, welcome_font_size)
+    welcome_font = template.font(welcome_font_size, template.font_path)
     welcome_stroke = max(1, welcome_font.size // 24)
     try:
         bbox = draw.textbbox((0, 0), welcome_text, font=welcome_font, stroke_width=welcome_stroke)
@@ -239,11 +349,24 @@ def main(welcome_text: str, user_text: str, input_path: str, output_path: str):
 
     draw_text_at(gradient, welcome_text, welcome_font, welcome_stroke, welcome_x, welcome_y)
     draw_text_at(gradient, user_text, user_font, user_stroke, user_x, user_y)
+    mark("text")
+
+    out = io.BytesIO()
+    gradient.save(out, format="PNG")
+    mark("encode")
+    return out.getvalue()
+
+def main(welcome_text: str, user_text: str, input_path: str, output_path: str, timings: Optional[dict] = None):
+    with open(input_path, "rb") as f:
+        avatar_bytes = f.read()
+    png = render_banner(welcome_text, user_text, avatar_bytes, timings=timings)
 
     out_dir = os.path.dirname(output_path)
     if out_dir and not os.path.exists(out_dir):
         os.makedirs(out_dir, exist_ok=True)
-    gradient.save(output_path)
+    with open(output_path, "wb") as f:
+        f.write(png)
 
-def generate_banner(w_text: str, user_name: str, input_image_path: str, output_image_path: str):
-    main(w_text, user_name, input_image_path, output_image_path)
\ No newline at end of file
+def generate_banner(w_text: str, user_name: str, input_image_path: str, output_image_path: str,
+                    timings: Optional[dict] = None):
+    main(w_text, user_name, input_image_path, output_image_path, timings=timings)
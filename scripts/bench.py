@@ -0,0 +1,251 @@
+# PerfectionBot/scripts/bench.py
+#
+# Micro-benchmarks for the hot paths. Each one compares the current code
+# against the way it was done before, on the local conf.yml and assets; no bot
+# login needed.
+#
+#   python -m PerfectionBot.scripts.bench
+#   python -m PerfectionBot.scripts.bench config --number 500000
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import timeit
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from PerfectionBot.config import yamlHandler
+from PerfectionBot.scripts import bannergenerator as bg
+
+
+# ---------------------------------------------------------------- config
+
+# what one filtered message used to look up through get_value()
+MESSAGE_KEYS = [
+    ("systems", "filter"),
+    ("systems", "leveling"),
+    ("behaviour", "flags", "FILTER_AFFECTS_ADMINS"),
+    ("behaviour", "filter", "DETECTION_THRESHOLD"),
+    ("behaviour", "flags", "WARN_DM"),
+    ("behaviour", "flags", "MUTE_TIME"),
+    ("behaviour", "flags", "FLAG_LIMIT"),
+    ("LOG_ID",),
+]
+
+
+def _message_via_get_value():
+    for keys in MESSAGE_KEYS:
+        try:
+            yamlHandler.get_value(*keys)
+        except KeyError:
+            pass
+
+
+def _message_via_snapshot():
+    cfg = yamlHandler.get_config()
+    cfg.systems.filter
+    cfg.systems.leveling
+    cfg.flags.filter_affects_admins
+    cfg.filter.detection_threshold
+    cfg.flags.warn_dm
+    cfg.flags.mute_time
+    cfg.flags.flag_limit
+    cfg.log_id
+
+
+def bench_config(args) -> dict:
+    """Config reads for one filtered message: get_value() walks vs the typed snapshot."""
+    results = {}
+    for name, func in (("get_value", _message_via_get_value), ("snapshot", _message_via_snapshot)):
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        results[name] = round(best / args.number * 1e6, 3)
+    results["lookups"] = len(MESSAGE_KEYS)
+    return results
+
+
+# ---------------------------------------------------------------- banner text fit
+
+NAMES = {
+    "short": "Alex",
+    "long": "TheQuickBrownFoxJumpsOverTheLazyDog_" * 4,
+    "unicode": "Ｎｅｏｎ 名前テスト ✨ Zoë Ørjan Ünïcödé Ĳsselmeer " * 3,
+}
+
+
+def _fit_step_down(image, text, font_path=None):
+    """The pre-bisection loop: one point smaller at a time, reloading the font at each step."""
+    draw = ImageDraw.Draw(image)
+    font_size = max(24, int(image.width * bg.FONT_SIZE_SCALE))
+    max_width = image.width - 2 * bg.TEXT_PADDING
+    max_height = image.height - 2 * bg.TEXT_PADDING
+    while True:
+        font = bg.load_font_path_safe(font_path, font_size)
+        stroke_width = max(1, font_size // 24)
+        bbox = draw.textbbox((0, 0), text, font=font, stroke_width=stroke_width)
+        w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        if (w <= max_width and h <= max_height) or font_size <= bg.MIN_FONT_SIZE:
+            return font_size, w, h
+        font_size -= 1
+
+
+def _best_ms(func, runs):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def bench_fit(args) -> dict:
+    """Username font fitting: old step-down loop vs bisection, cold (empty caches) and warm."""
+    image = Image.new("RGBA", (bg.GRADIENT_WIDTH, bg.GRADIENT_HEIGHT))
+    template = bg.BannerTemplate()
+    results = {}
+    for label, text in NAMES.items():
+        old_size, old_w, old_h = _fit_step_down(image, text)
+
+        def cold():
+            bg._measure_cache.clear()
+            template._fonts = threading.local()
+            return bg.compute_font_and_bbox(image, text, template=template)
+
+        font, _, w, h = cold()
+        if (font.size, w, h) != (old_size, old_w, old_h):
+            raise SystemExit(f"[bench] fit mismatch for {label}: {(font.size, w, h)} != {(old_size, old_w, old_h)}")
+
+        results[label] = (
+            f"size {old_size}: step-down {_best_ms(lambda: _fit_step_down(image, text), args.runs)}"
+            f" / bisect cold {_best_ms(cold, args.runs)}"
+            f" / warm {_best_ms(lambda: bg.compute_font_and_bbox(image, text, template=template), args.runs)}"
+        )
+    return results
+
+
+# ---------------------------------------------------------------- banner stages
+
+def _sample_avatar(path):
+    """512x512 avatar with a few colour blocks and some noise, so colour extraction has real work."""
+    rng = np.random.default_rng(7)
+    arr = rng.integers(0, 40, (512, 512, 3), dtype=np.uint8)
+    arr[:256, :, 0] += 180
+    arr[256:, :256, 2] += 150
+    arr[256:, 256:, 1] += 120
+    Image.fromarray(arr).save(path, format="PNG")
+
+
+def bench_stages(args) -> dict:
+    """Per-stage timings of bannergenerator.main (decode -> encode), median over --runs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        avatar = args.avatar
+        if not avatar:
+            avatar = os.path.join(tmp, "avatar.png")
+            _sample_avatar(avatar)
+        output = os.path.join(tmp, "banner.png")
+
+        # first render builds the template and font caches; keep it out of the numbers
+        bg.main("Welcome!", "Alex", avatar, output)
+        samples = {}
+        for _ in range(args.runs):
+            timings = {}
+            bg.main("Welcome!", "Alex", avatar, output, timings=timings)
+            for stage, ms in timings.items():
+                samples.setdefault(stage, []).append(ms)
+
+    results = {stage: round(statistics.median(values), 2) for stage, values in samples.items()}
+    results["total"] = round(sum(results.values()), 2)
+    return results
+
+
+# ---------------------------------------------------------------- background parity
+
+PARITY_TOLERANCE = 1  # max per-channel difference, in levels, from the old blur path
+
+
+def _background_reference(width, height, top, bottom, radius=bg.BLUR_RADIUS):
+    """What render_background replaced: full gradient, Gaussian blur, then RGB -> RGBA."""
+    gradient = bg.generate_vertical_gradient(width, height, top, bottom)
+    return gradient.filter(ImageFilter.GaussianBlur(radius=radius)).convert("RGBA")
+
+
+def _max_diff(width, height, top, bottom):
+    new = np.asarray(bg.render_background(width, height, top, bottom), dtype=np.int16)
+    old = np.asarray(_background_reference(width, height, top, bottom), dtype=np.int16)
+    return int(np.abs(new - old).max())
+
+
+def bench_parity(args) -> dict:
+    """
+    render_background vs the old gradient + GaussianBlur + convert. Covers the
+    extreme black->white ramp, random darkened colour pairs at banner size, and
+    every height from 2 to the banner height so both sides of _blur_is_noop's
+    threshold are exercised. Exits non-zero if any case is off by more than
+    PARITY_TOLERANCE.
+    """
+    black, white = (0, 0, 0), (255, 255, 255)
+    w, h = bg.GRADIENT_WIDTH, bg.GRADIENT_HEIGHT
+    worst = {}
+
+    worst["black->white"] = max(_max_diff(w, h, black, white), _max_diff(w, h, white, black))
+
+    rng = np.random.default_rng(35)
+    pairs = [tuple(bg.darken(tuple(int(c) for c in rng.integers(0, 256, 3)), bg.DARKEN_FACTOR) for _ in range(2))
+             for _ in range(args.pairs)]
+    worst["random pairs"] = max(_max_diff(w, h, top, bottom) for top, bottom in pairs)
+
+    # the ramp is uniform across a row, so a narrow canvas is enough for the height sweep
+    skipped = blurred = 0
+    sweep = 0
+    for height in range(2, h + 1):
+        if bg._blur_is_noop(height, black, white, bg.BLUR_RADIUS):
+            skipped += 1
+        else:
+            blurred += 1
+        sweep = max(sweep, _max_diff(32, height, black, white))
+    worst["height sweep"] = sweep
+    worst["blurred/skipped"] = f"{blurred}/{skipped}"
+
+    failed = [name for name, diff in worst.items() if isinstance(diff, int) and diff > PARITY_TOLERANCE]
+    if failed:
+        for name in failed:
+            print(f"[bench] parity FAILED for {name}: max diff {worst[name]} > {PARITY_TOLERANCE}")
+        raise SystemExit(1)
+    return worst
+
+
+BENCHES = {
+    "config": (bench_config, "us per message"),
+    "fit": (bench_fit, "ms per username, best run"),
+    "stages": (bench_stages, "ms per banner, median"),
+    "parity": (bench_parity, f"max level diff vs blur path, tolerance {PARITY_TOLERANCE}"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks.")
+    parser.add_argument("benches", nargs="*", metavar="bench", help=f"one of {', '.join(BENCHES)} (default: all)")
+    parser.add_argument("--number", type=int, default=200_000, help="calls per timing run for the config bench")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case; the best one is reported")
+    parser.add_argument("--runs", type=int, default=5, help="timing runs per case for the banner benches")
+    parser.add_argument("--pairs", type=int, default=50, help="random colour pairs for the parity check")
+    parser.add_argument("--avatar", help="avatar image for the stages bench (default: a generated 512x512 PNG)")
+    args = parser.parse_args(argv)
+
+    names = args.benches or list(BENCHES)
+    for name in names:
+        if name not in BENCHES:
+            parser.error(f"unknown bench {name!r}")
+
+    for name in names:
+        func, unit = BENCHES[name]
+        print(f"[bench] {name} ({unit})")
+        for key, value in func(args).items():
+            print(f"  {key:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
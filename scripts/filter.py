@@ -7,7 +7,7 @@ from itertools import combinations
 from rapidfuzz import fuzz, distance
 from wordfreq import zipf_frequency
 import spacy
-from PerfectionBot.config.yamlHandler import get_value
+from PerfectionBot.config.yamlHandler import get_config
 
 CONFIG_PATH = Path(__file__).parents[1] / "config" / "banned-keywords.config"
 SAFE_SUBSTRINGS = ["pass", "classic", "assignment", "class", "glass", "nagger", "dagger", "cam", "come", "where", "ore", "hoe", "grape", "whose", "who"]
@@ -60,7 +60,7 @@ blacklist_normalized = [normalize(w) for w in blacklist]
 
 def check_bad(message: str, threshold: int = None, max_edits: int = 1) -> dict | None:
     if threshold is None:
-        threshold = get_value("behaviour", "filter", "DETECTION_THRESHOLD")
+        threshold = get_config().filter.detection_threshold
 
     nm = normalize(message)
     doc = nlp(nm)
@@ -0,0 +1,106 @@
+# PerfectionBot/scripts/httpclient.py
+
+import asyncio
+import json as _json
+import aiohttp
+
+DEFAULT_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+MAX_RESPONSE_BYTES = 8 * 1024 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; PerfectionBot/1.0)"
+
+_session: aiohttp.ClientSession | None = None
+_stats = {"requests": 0, "failed": 0, "too_large": 0, "bytes": 0}
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Process-wide pooled session: keep-alive connections, cached DNS and a default
+    timeout. Created lazily on first use (must be called from the event loop) and
+    closed by close() on shutdown.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+            headers={"User-Agent": USER_AGENT}
+        )
+    return _session
+
+
+async def close():
+    global _session
+    session, _session = _session, None
+    if session and not session.closed:
+        await session.close()
+
+
+async def _read_body(resp, url: str, max_size: int) -> bytes | None:
+    if resp.content_length is not None and resp.content_length > max_size:
+        _stats["too_large"] += 1
+        print(f"[httpclient] {url} is {resp.content_length} bytes, over the {max_size} limit")
+        return None
+    buf = bytearray()
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        buf += chunk
+        if len(buf) > max_size:
+            _stats["too_large"] += 1
+            print(f"[httpclient] {url} exceeded the {max_size} byte limit")
+            return None
+    _stats["bytes"] += len(buf)
+    return bytes(buf)
+
+
+async def request_bytes(method: str, url: str, *, headers: dict | None = None, json=None,
+                        timeout: float = DEFAULT_TIMEOUT, max_size: int = MAX_RESPONSE_BYTES) -> bytes | None:
+    """Body of a 200 response (decompressed), or None on any other status, error or oversize body."""
+    _stats["requests"] += 1
+    try:
+        async with get_session().request(method, url, headers=headers, json=json,
+                                         timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            if resp.status != 200:
+                _stats["failed"] += 1
+                print(f"[httpclient] {method} {url} returned HTTP {resp.status}")
+                return None
+            return await _read_body(resp, url, max_size)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _stats["failed"] += 1
+        print(f"[httpclient] {method} {url} failed: {e!r}")
+        return None
+
+
+async def fetch_bytes(url: str, *, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+                      max_size: int = MAX_RESPONSE_BYTES) -> bytes | None:
+    return await request_bytes("GET", url, headers=headers, timeout=timeout, max_size=max_size)
+
+
+async def fetch_text(url: str, *, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+                     max_size: int = MAX_RESPONSE_BYTES) -> str | None:
+    body = await request_bytes("GET", url, headers=headers, timeout=timeout, max_size=max_size)
+    return body.decode("utf-8", errors="replace") if body is not None else None
+
+
+async def fetch_json(url: str, *, method: str = "GET", headers: dict | None = None, json=None,
+                     timeout: float = DEFAULT_TIMEOUT, max_size: int = MAX_RESPONSE_BYTES):
+    body = await request_bytes(method, url, headers=headers, json=json, timeout=timeout, max_size=max_size)
+    if body is None:
+        return None
+    try:
+        return _json.loads(body)
+    except ValueError as e:
+        _stats["failed"] += 1
+        print(f"[httpclient] {url} returned invalid JSON: {e}")
+        return None
+
+
+def stats() -> dict:
+    session = _session
+    connector = session.connector if session and not session.closed else None
+    return dict(_stats, open=connector is not None)
@@ -8,6 +8,19 @@ from collections import defaultdict
 from PerfectionBot.config.yamlHandler import get_value
 
 _pending_lockdowns: dict[int, dict[int, dict]] = defaultdict(dict)
+_locked_users: set[tuple[int, int]] = set()
+
+
+def claim_lockdown(guild_id: int, user_id: int) -> bool:
+    key = (guild_id, user_id)
+    if key in _locked_users:
+        return False
+    _locked_users.add(key)
+    return True
+
+
+def release_lockdown(guild_id: int, user_id: int):
+    _locked_users.discard((guild_id, user_id))
 
 
 def get_pending_lockdown(guild_id: int, channel_id: int) -> dict | None:
@@ -19,6 +32,19 @@ async def initiate_lockdown(
     member: discord.Member,
     word: str,
     evt: str
+):
+    try:
+        await _initiate_lockdown(guild, member, word, evt)
+    except Exception:
+        release_lockdown(guild.id, member.id)
+        raise
+
+
+async def _initiate_lockdown(
+    guild: discord.Guild,
+    member: discord.Member,
+    word: str,
+    evt: str
 ):
     lockdown_role = guild.get_role(get_value("roles", "lockdown_ID"))
     mod_role = guild.get_role(get_value("roles", "mod_ID"))
@@ -61,6 +87,7 @@ async def handle_confirm(
         return await ctx.send("Nothing pending here.")
 
     user_id = pend["user_id"]
+    release_lockdown(ctx.guild.id, user_id)
     action = pend["action"]
     member = ctx.guild.get_member(user_id)
 
@@ -104,6 +131,7 @@ async def handle_revoke(
         return await ctx.send("Nothing pending here.")
 
     user_id = pend["user_id"]
+    release_lockdown(ctx.guild.id, user_id)
     word = pend["word"]
     member = ctx.guild.get_member(user_id)
 
@@ -1,7 +1,7 @@
 #log
 
 import discord
-from PerfectionBot.config.yamlHandler import get_value
+from PerfectionBot.config.yamlHandler import get_value, get_config
 
 ICON_URLS = {
     "warn": get_value("ICONS", "icon_warn"),
@@ -21,7 +21,7 @@ async def log_to_channel(
     event_type: str = "info"
 ):
     try:
-        log_channel_id = get_value("LOG_ID")
+        log_channel_id = get_config().log_id
         channel = guild.get_channel(log_channel_id)
         if not channel or not isinstance(channel, discord.TextChannel):
             return
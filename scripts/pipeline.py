@@ -0,0 +1,198 @@
+# PerfectionBot/scripts/pipeline.py
+
+import asyncio
+import time
+from collections import deque
+
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = 1
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAXSIZE = 1000
+LATENCY_SAMPLES = 256
+
+
+class _Job:
+    __slots__ = ("guild_id", "priority", "enqueued", "message", "kwargs")
+
+    def __init__(self, guild_id, priority, message, kwargs):
+        self.guild_id = guild_id
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.message = message
+        self.kwargs = kwargs
+
+
+class _Shard:
+    """
+    One worker's queue. Jobs are kept in one lane per guild and taken round-robin
+    across guilds, so one busy guild can't starve the others. Capacity is enforced by
+    a bounded asyncio.Queue of tickets (one per queued job).
+    """
+
+    def __init__(self, maxsize: int):
+        self.tickets: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.lanes: dict[int, deque] = {}
+        self.rr: deque = deque()
+
+    def push(self, job: _Job):
+        lane = self.lanes.get(job.guild_id)
+        if lane is None:
+            lane = self.lanes[job.guild_id] = deque()
+        if not lane:
+            self.rr.append(job.guild_id)
+        lane.append(job)
+
+    def take(self) -> _Job | None:
+        while self.rr:
+            gid = self.rr.popleft()
+            lane = self.lanes.get(gid)
+            if not lane:
+                self.lanes.pop(gid, None)
+                continue
+            job = lane.popleft()
+            if lane:
+                self.rr.append(gid)
+            else:
+                del self.lanes[gid]
+            return job
+        return None
+
+    def remove(self, gid: int, lane: deque, job: _Job):
+        lane.remove(job)
+        if not lane:
+            del self.lanes[gid]
+            try:
+                self.rr.remove(gid)
+            except ValueError:
+                pass
+
+
+class MessagePipeline:
+    """
+    Bounded, sharded message queue.
+
+    Every (guild, author) pair is routed to a fixed shard and each shard is drained by
+    exactly one worker, so events from one user run strictly in order and never
+    interleave (flag counters, timeouts and lockdown checks can't race), while
+    different users are still handled in parallel across shards.
+
+    When a shard is full, low-priority jobs (edits, bot channels) are shed first,
+    then the oldest job of the busiest guild lane.
+    """
+
+    def __init__(self, handler, workers: int = DEFAULT_WORKERS, maxsize: int = DEFAULT_MAXSIZE):
+        self._handler = handler
+        self._worker_count = max(1, workers)
+        self._maxsize = max(self._worker_count, maxsize)
+        per_shard = -(-self._maxsize // self._worker_count)
+        self._shards = [_Shard(per_shard) for _ in range(self._worker_count)]
+        self._workers: list[asyncio.Task] = []
+
+        self._processed = 0
+        self._failed = 0
+        self._dropped = {"low_priority": 0, "evicted": 0, "full": 0}
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._latency_max = 0.0
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(shard)) for shard in self._shards]
+
+    async def stop(self):
+        workers, self._workers = self._workers, []
+        for t in workers:
+            t.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def depth(self) -> int:
+        return sum(shard.tickets.qsize() for shard in self._shards)
+
+    def _shard_for(self, guild_id: int, user_id: int) -> _Shard:
+        return self._shards[hash((guild_id, user_id)) % len(self._shards)]
+
+    def submit(self, message, priority: int = PRIORITY_NORMAL, **kwargs) -> bool:
+        guild_id = message.guild.id if message.guild else 0
+        job = _Job(guild_id, priority, message, kwargs)
+        shard = self._shard_for(guild_id, message.author.id)
+
+        if not shard.tickets.full():
+            shard.push(job)
+            shard.tickets.put_nowait(None)
+            return True
+
+        if priority >= PRIORITY_LOW:
+            self._dropped["low_priority"] += 1
+            return False
+
+        if self._evict_for(shard, guild_id):
+            shard.push(job)
+            return True
+
+        self._dropped["full"] += 1
+        return False
+
+    def _evict_for(self, shard: _Shard, guild_id: int) -> bool:
+        by_size = sorted(shard.lanes.items(), key=lambda kv: len(kv[1]), reverse=True)
+
+        for gid, lane in by_size:
+            for job in reversed(lane):
+                if job.priority >= PRIORITY_LOW:
+                    shard.remove(gid, lane, job)
+                    self._dropped["low_priority"] += 1
+                    return True
+
+        own = len(shard.lanes.get(guild_id, ()))
+        if by_size and len(by_size[0][1]) > own:
+            gid, lane = by_size[0]
+            shard.remove(gid, lane, lane[0])
+            self._dropped["evicted"] += 1
+            return True
+        return False
+
+    async def _worker(self, shard: _Shard):
+        while True:
+            await shard.tickets.get()
+            try:
+                job = shard.take()
+                if job is None:
+                    continue
+                try:
+                    await self._handler(job.message, **job.kwargs)
+                    self._processed += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._failed += 1
+                    print(f"[pipeline] handler failed: {e}")
+                finally:
+                    self._record_latency(time.perf_counter() - job.enqueued)
+            finally:
+                shard.tickets.task_done()
+
+    def _record_latency(self, latency: float):
+        self._latencies.append(latency)
+        if latency > self._latency_max:
+            self._latency_max = latency
+
+    def stats(self) -> dict:
+        samples = sorted(self._latencies)
+        if samples:
+            avg = sum(samples) / len(samples)
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        else:
+            avg = p95 = 0.0
+        return {
+            "depth": self.depth(),
+            "maxsize": self._maxsize,
+            "workers": len(self._workers),
+            "guild_lanes": sum(len(shard.lanes) for shard in self._shards),
+            "processed": self._processed,
+            "failed": self._failed,
+            "dropped": dict(self._dropped),
+            "latency_avg_ms": avg * 1000,
+            "latency_p95_ms": p95 * 1000,
+            "latency_max_ms": self._latency_max * 1000,
+        }
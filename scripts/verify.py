@@ -5,7 +5,7 @@ import json
 import asyncio
 
 from PerfectionBot.scripts.log import log_to_channel
-from PerfectionBot.config.yamlHandler import get_value
+from PerfectionBot.config.yamlHandler import get_value, get_config
 
 verify_msg_ids: dict[int, int] = {}
 
@@ -51,8 +51,8 @@ async def GetVerifyMsg(channel: discord.TextChannel) -> discord.Message | None :
 
 async def add_role(guild: discord.Guild, user: discord.Member) :
     try:
-        verified_id = get_value("roles", "verified_ID")
-        verified = discord.utils.get(guild.roles, id=verified_id)
+        verified_id = get_config().roles.verified
+        verified = guild.get_role(verified_id)
         if verified:
             await user.add_roles(verified)
         else:
@@ -5,7 +5,7 @@ import platform
 import shutil
 import subprocess
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
 
 import discord
 from discord.ext import commands
@@ -19,6 +19,31 @@ except Exception:
     psutil = None
 
 
+_metric_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    _metric_providers[name] = provider
+
+
+def _collect_metrics() -> dict:
+    out = {}
+    for name, provider in list(_metric_providers.items()):
+        try:
+            out[name] = provider()
+        except Exception as e:
+            out[name] = {"error": str(e)}
+    return out
+
+
+def _format_metric_value(v) -> str:
+    if isinstance(v, float):
+        return f"{v:,.1f}"
+    if isinstance(v, dict):
+        return ", ".join(f"{k}={_format_metric_value(x)}" for k, x in v.items())
+    return str(v)
+
+
 def _format_bytes(n: Optional[int]) -> str:
     if n is None:
         return "N/A"
@@ -155,6 +180,7 @@ async def collect_status(bot: discord.Client) -> dict:
         "state": state,
         "error_conditions": error_conditions,
         "warn_conditions": warn_conditions,
+        "metrics": _collect_metrics(),
     }
 
 
@@ -201,6 +227,10 @@ def _make_status_embed(status: dict) -> discord.Embed:
     emb.add_field(name="Python", value=status.get("python_version", "Unknown"), inline=True)
     emb.add_field(name="Version", value=str(status.get("version", "unknown")), inline=True)
 
+    for name, values in (status.get("metrics") or {}).items():
+        lines = "\n".join(f"{k}: {_format_metric_value(v)}" for k, v in values.items())
+        emb.add_field(name=name, value=lines[:1024] or "N/A", inline=False)
+
     if status.get("error_conditions"):
         emb.add_field(name="Errors", value=", ".join(status["error_conditions"]), inline=False)
     elif status.get("warn_conditions"):
@@ -0,0 +1,254 @@
+# PerfectionBot/scripts/websub.py
+
+import asyncio
+import hashlib
+import hmac
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import aiohttp
+from aiohttp import web
+
+from PerfectionBot.scripts import httpclient
+
+DEFAULT_HUB = "https://pubsubhubbub.appspot.com/subscribe"
+TOPIC_URL = "https://www.youtube.com/xml/feeds/videos.xml?channel_id={}"
+LEASE_SECONDS = 5 * 24 * 3600
+SEEN_LIMIT = 1024
+
+_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+}
+
+
+def topic_for(channel_id: str) -> str:
+    return TOPIC_URL.format(channel_id)
+
+
+def parse_feed(body: bytes) -> list:
+    """Atom notification -> [(channel_id, video_id, published datetime or None)]."""
+    root = ET.fromstring(body)
+    entries = []
+    for entry in root.findall("atom:entry", _NS):
+        video_id = entry.findtext("yt:videoId", namespaces=_NS)
+        channel_id = entry.findtext("yt:channelId", namespaces=_NS)
+        if not video_id or not channel_id:
+            continue
+        published = None
+        raw = entry.findtext("atom:published", namespaces=_NS)
+        if raw:
+            try:
+                published = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+            except ValueError:
+                pass
+        entries.append((channel_id, video_id, published))
+    return entries
+
+
+def verify_signature(secret: str, body: bytes, header: str | None) -> bool:
+    """
+    Checks X-Hub-Signature ("sha1=<hex>", or another hashlib algorithm) against
+    body. With no secret there is nothing to check and every body passes, which
+    is why yt.py won't start push mode without one.
+    """
+    if not secret:
+        return True
+    if not header or "=" not in header:
+        return False
+    algo, _, digest = header.partition("=")
+    if algo not in ("sha1", "sha256", "sha384", "sha512"):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, getattr(hashlib, algo)).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+class WebSubReceiver:
+    """
+    Small aiohttp endpoint for YouTube's WebSub (PubSubHubbub) push feed. GET
+    answers the hub's verification challenge only for subscribe/unsubscribe
+    requests we made ourselves (404 otherwise); POST checks
+    the HMAC signature, parses the Atom entries and hands new video ids to
+    `on_videos` once each. Each verified subscribe records its lease expiry;
+    is_verified() is only true while that lease is current, and a renewal the hub
+    refuses drops it.
+    """
+
+    def __init__(self, on_videos, *, callback_url: str, secret: str = "", hub_url: str = DEFAULT_HUB,
+                 host: str = "0.0.0.0", port: int = 8080, path: str = "/websub",
+                 lease_seconds: int = LEASE_SECONDS):
+        self._on_videos = on_videos
+        self.callback_url = callback_url
+        self.secret = secret
+        self.hub_url = hub_url
+        self.host = host
+        self.port = port
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._topics = set()
+        self._pending_unsubscribe = set()
+        self._leases = {}  # topic -> monotonic time the verified lease runs out
+        self._seen = OrderedDict()
+        self._runner = None
+        self._renew_task = None
+        self._tasks = set()
+        self.counters = {"notifications": 0, "videos": 0, "duplicates": 0, "bad_signature": 0,
+                         "verified": 0, "subscribe_failed": 0}
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get(self.path, self._handle_verify)
+        app.router.add_post(self.path, self._handle_notify)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"[websub] listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._renew_task:
+            self._renew_task.cancel()
+            self._renew_task = None
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def subscribe_all(self, channel_ids) -> int:
+        """Subscribes every topic; returns how many requests the hub accepted."""
+        self._topics.update(topic_for(cid) for cid in channel_ids)
+        self._pending_unsubscribe -= self._topics
+        results = await asyncio.gather(*(self._request(topic, "subscribe") for topic in self._topics))
+        if self._renew_task is None:
+            self._renew_task = asyncio.create_task(self._renew_loop())
+        return sum(results)
+
+    async def unsubscribe(self, channel_ids):
+        topics = {topic_for(cid) for cid in channel_ids}
+        self._topics -= topics
+        for topic in topics:
+            self._leases.pop(topic, None)
+        self._pending_unsubscribe |= topics
+        results = await asyncio.gather(*(self._request(topic, "unsubscribe") for topic in topics))
+        for topic, accepted in zip(topics, results):
+            if not accepted:
+                self._pending_unsubscribe.discard(topic)
+
+    def is_verified(self, channel_id: str) -> bool:
+        """True while the hub's last confirmed lease for this channel has not run out."""
+        expires = self._leases.get(topic_for(channel_id))
+        return expires is not None and expires > time.monotonic()
+
+    def _renew_delay(self) -> float:
+        # the hub may grant less than we asked for, so renew at 80% of the shortest lease
+        now = time.monotonic()
+        remaining = [expires - now for expires in self._leases.values() if expires > now]
+        if not remaining:
+            return self.lease_seconds * 0.8
+        return max(60.0, min(remaining) * 0.8)
+
+    async def renew(self):
+        """Re-subscribes every topic; one the hub refuses loses its lease straight away."""
+        topics = list(self._topics)
+        results = await asyncio.gather(*(self._request(topic, "subscribe") for topic in topics))
+        for topic, accepted in zip(topics, results):
+            if not accepted:
+                self._leases.pop(topic, None)
+
+    async def _renew_loop(self):
+        while True:
+            await asyncio.sleep(self._renew_delay())
+            await self.renew()
+
+    async def _request(self, topic: str, mode: str) -> bool:
+        data = {
+            "hub.callback": self.callback_url,
+            "hub.mode": mode,
+            "hub.topic": topic,
+            "hub.verify": "async",
+            "hub.lease_seconds": str(self.lease_seconds),
+        }
+        if self.secret:
+            data["hub.secret"] = self.secret
+        try:
+            async with httpclient.get_session().post(self.hub_url, data=data) as resp:
+                if resp.status in (202, 204):
+                    return True
+                print(f"[websub] hub refused {mode} for {topic}: HTTP {resp.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[websub] {mode} request for {topic} failed: {e!r}")
+        self.counters["subscribe_failed"] += 1
+        return False
+
+    async def _handle_verify(self, request: web.Request):
+        mode = request.query.get("hub.mode")
+        topic = request.query.get("hub.topic")
+        challenge = request.query.get("hub.challenge")
+        if not challenge or mode not in ("subscribe", "unsubscribe"):
+            return web.Response(status=400)
+        # only confirm what we asked for, otherwise anyone could get us unsubscribed
+        if mode == "subscribe" and topic not in self._topics:
+            return web.Response(status=404)
+        if mode == "unsubscribe":
+            if topic not in self._pending_unsubscribe:
+                return web.Response(status=404)
+            self._pending_unsubscribe.discard(topic)
+        if mode == "subscribe":
+            try:
+                lease = int(request.query.get("hub.lease_seconds") or self.lease_seconds)
+            except ValueError:
+                lease = self.lease_seconds
+            self._leases[topic] = time.monotonic() + lease
+        self.counters["verified"] += 1
+        return web.Response(text=challenge)
+
+    async def _handle_notify(self, request: web.Request):
+        body = await request.read()
+        self.counters["notifications"] += 1
+        # per spec a bad signature is acknowledged but the payload is ignored
+        if not verify_signature(self.secret, body, request.headers.get("X-Hub-Signature")):
+            self.counters["bad_signature"] += 1
+            return web.Response(status=202)
+        try:
+            entries = parse_feed(body)
+        except ET.ParseError as e:
+            print(f"[websub] unparsable notification: {e}")
+            return web.Response(status=202)
+
+        fresh = []
+        for channel_id, video_id, published in entries:
+            if video_id in self._seen:
+                self.counters["duplicates"] += 1
+                continue
+            self._seen[video_id] = True
+            if len(self._seen) > SEEN_LIMIT:
+                self._seen.popitem(last=False)
+            fresh.append((channel_id, video_id, published))
+
+        if fresh:
+            self.counters["videos"] += len(fresh)
+            # answer the hub straight away; announcing happens in the background
+            task = asyncio.create_task(self._dispatch(fresh))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return web.Response(status=204)
+
+    async def _dispatch(self, entries):
+        try:
+            await self._on_videos(entries)
+        except Exception as e:
+            print(f"[websub] handling pushed videos failed: {e}")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return dict(self.counters, topics=len(self._topics),
+                    leased=sum(1 for expires in self._leases.values() if expires > now))
+
+
+def is_recent(published: datetime | None, max_age_seconds: float) -> bool:
+    # feed updates (title edits etc.) re-send old videos; only new ones are announced
+    if published is None:
+        return True
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - published).total_seconds() <= max_age_seconds
@@ -0,0 +1,232 @@
+# PerfectionBot/scripts/welcome.py
+
+import asyncio
+import io
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import discord
+
+from PerfectionBot.config.yamlHandler import get_config
+from PerfectionBot.scripts import bannercache, bannergenerator, httpclient
+
+RENDER_WORKERS = 2
+RENDER_MAX_PENDING = 6  # renders queued or running before greetings degrade to text-only
+AVATAR_TIMEOUT = 5
+AVATAR_MAX_BYTES = 4 * 1024 * 1024
+MESSAGE_LIMIT = 2000
+
+PLAN_TEXT = "text"
+PLAN_CARD = "card"
+PLAN_BATCHED = "batched"
+
+
+class RenderPool:
+    """
+    Runs banner rendering (PIL) on a dedicated thread pool so joins never block the
+    event loop. At most `max_pending` renders may be queued or running; past that
+    render() returns None straight away and the caller sends a text-only greeting.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_pending: int = RENDER_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="banner")
+        self._workers = workers
+        self._max_pending = max_pending
+        self._pending = 0
+        self.rendered = 0
+        self.degraded = 0
+        self.failed = 0
+
+    async def render(self, func, *args):
+        if self._pending >= self._max_pending:
+            self.degraded += 1
+            return None
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, partial(func, *args))
+            self.rendered += 1
+            return result
+        except Exception as e:
+            self.failed += 1
+            print(f"[welcome] banner render failed: {e}")
+            return None
+        finally:
+            self._pending -= 1
+
+    async def warm_up(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, bannergenerator.get_template)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._workers,
+            "pending": self._pending,
+            "rendered": self.rendered,
+            "degraded": self.degraded,
+            "failed": self.failed,
+        }
+
+
+render_pool = RenderPool()
+
+
+def avatar_key(member: discord.Member) -> str:
+    # Asset.key is the content hash embedded in the CDN url; default avatars are shared
+    if member.avatar:
+        return member.avatar.key
+    return f"default-{member.default_avatar.key}"
+
+
+async def fetch_avatar(member: discord.Member) -> bytes | None:
+    key = avatar_key(member)
+    data = await bannercache.avatars.fetch(key)
+    if data is None:
+        avatar_url = (member.avatar or member.default_avatar).url
+        data = await httpclient.fetch_bytes(avatar_url, timeout=AVATAR_TIMEOUT, max_size=AVATAR_MAX_BYTES)
+        if data:
+            await bannercache.avatars.store(key, data)
+    return data
+
+
+async def get_banner(member: discord.Member, greeting: str) -> bytes | None:
+    user_text = str(member)
+    key = (avatar_key(member), greeting, user_text, bannergenerator.TEMPLATE_VERSION)
+    png = await bannercache.banners.fetch(key)
+    if png is not None:
+        return png
+    avatar = await fetch_avatar(member)
+    if not avatar:
+        return None
+    png = await render_pool.render(bannergenerator.render_banner, greeting, user_text, avatar)
+    if png:
+        await bannercache.banners.store(key, png)
+    return png
+
+
+async def _get_channel(bot: discord.Client, channel_id: int):
+    return bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+
+async def send_greeting(bot: discord.Client, member: discord.Member, joined: bool, card: bool = True):
+    cfg = get_config().welcome
+    greeting = "Welcome" if joined else "Goodbye"
+    template = cfg.welcome_message if joined else cfg.goodbye_message
+    msg = template.replace("{user}", member.mention)
+
+    png = None
+    if card:
+        bannercache.configure(cfg.banner_disk_cache)
+        png = await get_banner(member, greeting)
+
+    channel = await _get_channel(bot, cfg.channel_id)
+
+    if png:
+        await channel.send(content=msg, file=discord.File(io.BytesIO(png), filename=f"{greeting.lower()}.png"))
+    else:
+        await channel.send(content=msg)
+
+
+def _chunk_mentions(template: str, mentions: list) -> list:
+    """Fills {user} with as many mentions as fit in one Discord message, per message."""
+    budget = MESSAGE_LIMIT - len(template) + len("{user}")
+    chunks, current, size = [], [], 0
+    for mention in mentions:
+        extra = len(mention) + (2 if current else 0)
+        if current and size + extra > budget:
+            chunks.append(current)
+            current, size = [], 0
+            extra = len(mention)
+        current.append(mention)
+        size += extra
+    if current:
+        chunks.append(current)
+    return [template.replace("{user}", ", ".join(chunk)) for chunk in chunks]
+
+
+class GreetingAggregator:
+    """
+    Sends greetings one by one while joins/leaves are slow. When more than
+    WELCOME.RAID.JOINS_PER_SECOND arrive within a second it opens a batch: members
+    are collected for WELCOME.RAID.WINDOW seconds and greeted with a single text
+    message listing their mentions, so a raid costs one send per window instead of
+    one render and upload per member.
+    """
+
+    def __init__(self):
+        self._recent = {True: deque(), False: deque()}
+        self._batches = {True: None, False: None}
+        self._tasks = set()
+        self.plans = {PLAN_TEXT: 0, PLAN_CARD: 0, PLAN_BATCHED: 0}
+        self.windows = 0
+
+    def _in_raid(self, joined: bool, limit: int) -> bool:
+        now = time.monotonic()
+        recent = self._recent[joined]
+        recent.append(now)
+        while recent and now - recent[0] > 1.0:
+            recent.popleft()
+        return len(recent) > limit
+
+    def plan(self, joined: bool) -> str:
+        """
+        Decides how one join/leave is greeted: folded into a raid batch, a text-only
+        message (cards disabled in WELCOME.SHOW_CARD_ON_ENTER/LEAVE) or a banner card.
+        Only the card plan downloads the avatar and renders.
+        """
+        cfg = get_config().welcome
+        raid = self._in_raid(joined, max(1, cfg.raid_joins_per_second))
+        if self._batches[joined] is not None or raid:
+            return PLAN_BATCHED
+        show_card = cfg.show_card_on_enter if joined else cfg.show_card_on_leave
+        return PLAN_CARD if show_card else PLAN_TEXT
+
+    async def handle(self, bot: discord.Client, member: discord.Member, joined: bool):
+        plan = self.plan(joined)
+        self.plans[plan] += 1
+
+        if plan == PLAN_BATCHED:
+            batch = self._batches[joined]
+            if batch is None:
+                batch = self._batches[joined] = []
+                window = max(1, get_config().welcome.raid_window)
+                task = asyncio.create_task(self._flush_later(bot, joined, window))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            batch.append(member.mention)
+            return
+
+        await send_greeting(bot, member, joined, card=plan == PLAN_CARD)
+
+    async def _flush_later(self, bot: discord.Client, joined: bool, window: int):
+        await asyncio.sleep(window)
+        mentions, self._batches[joined] = self._batches[joined], None
+        if not mentions:
+            return
+        self.windows += 1
+        cfg = get_config().welcome
+        template = cfg.welcome_message if joined else cfg.goodbye_message
+        try:
+            channel = await _get_channel(bot, cfg.channel_id)
+            for content in _chunk_mentions(template, mentions):
+                await channel.send(content=content)
+        except Exception as e:
+            print(f"[welcome] batched greeting failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "cards": self.plans[PLAN_CARD],
+            "text_only": self.plans[PLAN_TEXT],
+            "batched": self.plans[PLAN_BATCHED],
+            "renders_avoided": self.plans[PLAN_TEXT] + self.plans[PLAN_BATCHED],
+            "windows": self.windows,
+            "open": sum(1 for b in self._batches.values() if b is not None),
+        }
+
+
+aggregator = GreetingAggregator()
@@ -5,12 +5,18 @@ import random
 import time
 import json
 import io
-import requests
+import tempfile
+import threading
 
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
 from functools import partial
+from pathlib import Path
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 from PerfectionBot.config.yamlHandler import get_value
+from PerfectionBot.scripts import httpclient, websub
 
 
 def to_bool(value):
@@ -29,7 +35,238 @@ IGNORE_VIDEOS            = to_bool(get_value("youtube", "flags", "IGNORE_VIDEOS"
 IGNORE_STREAMS           = to_bool(get_value("youtube", "flags", "IGNORE_STREAMS"))
 IGNORE_POSTS             = to_bool(get_value("youtube", "flags", "IGNORE_POSTS"))
 ANNOUNCEMENTS            = get_value("youtube", "announcements")
-ANNOUNCEMENT_CHANNEL_ID  = int(get_value("youtube", "flags", "ANNOUNCEMENT_CHANNEL_ID"))
+ANNOUNCEMENT_CHANNEL_ID  = int(get_value("youtube", "flags", "ANNOUNCEMENT_CHANNEL_ID") or 0)
+IMAGE_MAX_BYTES          = 8 * 1024 * 1024
+
+
+def _optional_value(*keys, default):
+    try:
+        value = get_value(*keys)
+    except KeyError:
+        return default
+    return default if value in (None, "") else value
+
+
+def _optional_int(*keys, default):
+    try:
+        return int(_optional_value(*keys, default=default))
+    except (TypeError, ValueError):
+        return default
+
+
+DAILY_QUOTA              = _optional_int("youtube", "flags", "DAILY_QUOTA", default=10000)
+MAX_INTERVAL             = _optional_int("youtube", "flags", "MAX_INTERVAL", default=600)
+
+WEBSUB_ENABLED           = to_bool(_optional_value("youtube", "websub", "ENABLED", default=False))
+WEBSUB_CALLBACK_URL      = str(_optional_value("youtube", "websub", "CALLBACK_URL", default=""))
+WEBSUB_HOST              = str(_optional_value("youtube", "websub", "HOST", default="0.0.0.0"))
+WEBSUB_PORT              = _optional_int("youtube", "websub", "PORT", default=8080)
+WEBSUB_PATH              = str(_optional_value("youtube", "websub", "PATH", default="/websub"))
+WEBSUB_SECRET            = str(_optional_value("youtube", "websub", "SECRET", default=""))
+WEBSUB_HUB_URL           = str(_optional_value("youtube", "websub", "HUB_URL", default=websub.DEFAULT_HUB))
+WEBSUB_FALLBACK_INTERVAL = _optional_int("youtube", "websub", "FALLBACK_INTERVAL", default=900)
+DEBUG_DUMPS              = to_bool(_optional_value("youtube", "flags", "DEBUG_DUMPS", default=False))
+DEBUG_DUMP_PATH          = Path(tempfile.gettempdir()) / "yt_community.html"
+PUSH_MAX_AGE             = 24 * 3600  # pushed entries published earlier than this are feed updates, not uploads
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+RESOLVE_CACHE_PATH = DATA_DIR / "yt_resolve.json"
+STATE_PATH = DATA_DIR / "yt_state.json"
+SEEN_LIMIT = 50  # announced video/post ids remembered per subscription
+RESOLVE_TTL = 30 * 24 * 3600  # handles and uploads playlists practically never change
+
+# Data API v3 cost in quota units per call, keyed by resource
+QUOTA_COSTS = {"channels": 1, "playlistItems": 1, "videos": 1, "search": 100}
+API_CONCURRENCY = 4     # Data API calls in flight at once, across all subscriptions
+VIDEOS_BATCH = 50       # ids per videos().list call (API maximum)
+RESOLVE_RETRY = 3600    # seconds before retrying a @handle that could not be resolved
+ETAG_LIMIT = 256        # responses kept for If-None-Match revalidation
+
+# partial responses: only the fields the monitor actually reads
+SEARCH_FIELDS = "items(snippet/channelId)"
+CHANNEL_FIELDS = "items(contentDetails/relatedPlaylists/uploads)"
+PLAYLIST_FIELDS = "items(contentDetails/videoId)"
+VIDEO_FIELDS = (
+    "items(id,snippet(channelId,title,description,publishedAt,liveBroadcastContent,thumbnails),"
+    "status/uploadStatus,liveStreamingDetails/scheduledStartTime,contentDetails/duration)"
+)
+
+
+def _quota_day_start(now: datetime) -> datetime:
+    # API quota resets at midnight Pacific time
+    try:
+        from zoneinfo import ZoneInfo
+        local = now.astimezone(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        local = now.astimezone(timezone(timedelta(hours=-8)))
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class PollScheduler:
+    """
+    Paces the monitor loop. Every API call is charged to a daily quota; the wait
+    between polls is the longest of CHECK_INTERVAL, the pace that makes the rest of
+    today's budget last until the quota reset, and an idle backoff that doubles every
+    few polls (up to MAX_INTERVAL) while nothing new turns up.
+    """
+
+    def __init__(self, base_interval: int, daily_budget: int, max_interval: int):
+        self.base_interval = max(1, base_interval)
+        self.daily_budget = max(1, daily_budget)
+        self.max_interval = max(self.base_interval, max_interval)
+        self._day = _quota_day_start(datetime.now(timezone.utc))
+        self.used_today = 0
+        self.calls = {}
+        self.units = {}
+        self.polls = 0
+        self.idle_streak = 0
+        self.interval = self.base_interval
+        self.last_poll_ms = 0.0
+        self._poll_ms_total = 0.0
+        self._poll_units = 0
+        self._units_per_poll = 2.0
+
+    def _roll_day(self, now: datetime):
+        day = _quota_day_start(now)
+        if day != self._day:
+            self._day = day
+            self.used_today = 0
+
+    def charge(self, kind: str):
+        self._roll_day(datetime.now(timezone.utc))
+        cost = QUOTA_COSTS.get(kind, 1)
+        self.used_today += cost
+        self._poll_units += cost
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        self.units[kind] = self.units.get(kind, 0) + cost
+
+    def record_poll(self, changed: bool, seconds: float):
+        self.polls += 1
+        self.last_poll_ms = seconds * 1000
+        self._poll_ms_total += self.last_poll_ms
+        self.idle_streak = 0 if changed else self.idle_streak + 1
+        # smoothed cost of one poll, used to pace the remaining budget
+        self._units_per_poll = 0.8 * self._units_per_poll + 0.2 * max(1, self._poll_units)
+        self._poll_units = 0
+
+    def next_interval(self) -> float:
+        now = datetime.now(timezone.utc)
+        self._roll_day(now)
+        until_reset = (self._day + timedelta(days=1) - now).total_seconds()
+        remaining = self.daily_budget - self.used_today
+        if remaining <= 0:
+            print(f"[yt] daily quota budget of {self.daily_budget} units spent, waiting for the reset")
+            return max(self.base_interval, until_reset)
+
+        budget_pace = until_reset * self._units_per_poll / remaining
+        backoff = min(self.max_interval, self.base_interval * 2 ** min(self.idle_streak // 4, 8))
+        return max(self.base_interval, budget_pace, backoff)
+
+    async def wait(self):
+        self.interval = self.next_interval()
+        await asyncio.sleep(self.interval * random.uniform(1.0, 1.1))
+
+    def stats(self) -> dict:
+        return {
+            "polls": self.polls,
+            "quota_today": f"{self.used_today}/{self.daily_budget}",
+            "interval_s": round(self.interval, 1),
+            "idle_streak": self.idle_streak,
+            "last_poll_ms": round(self.last_poll_ms, 1),
+            "avg_poll_ms": round(self._poll_ms_total / self.polls, 1) if self.polls else 0,
+            **{f"units_{k}": v for k, v in self.units.items()},
+            **({f"push_{k}": v for k, v in push_receiver.stats().items()} if push_receiver else {}),
+        }
+
+
+poll_scheduler = PollScheduler(CHECK_INTERVAL, DAILY_QUOTA, MAX_INTERVAL)
+
+
+_resolve_cache = None
+
+
+def _load_resolve_cache() -> dict:
+    global _resolve_cache
+    if _resolve_cache is None:
+        try:
+            with RESOLVE_CACHE_PATH.open("r", encoding="utf-8") as f:
+                _resolve_cache = json.load(f)
+        except FileNotFoundError:
+            _resolve_cache = {}
+        except Exception as e:
+            print(f"Failed to load {RESOLVE_CACHE_PATH.name}: {e}")
+            _resolve_cache = {}
+        _resolve_cache.setdefault("handles", {})
+        _resolve_cache.setdefault("uploads", {})
+    return _resolve_cache
+
+
+def _save_resolve_cache():
+    try:
+        with RESOLVE_CACHE_PATH.open("w", encoding="utf-8") as f:
+            json.dump(_resolve_cache, f, indent=2)
+    except Exception as e:
+        print(f"Failed to save {RESOLVE_CACHE_PATH.name}: {e}")
+
+
+def _cache_get(section: str, key: str):
+    entry = _load_resolve_cache()[section].get(key)
+    if entry and time.time() - entry.get("ts", 0) < RESOLVE_TTL:
+        return entry.get("value")
+    return None
+
+
+def _cache_put(section: str, key: str, value):
+    cache = _load_resolve_cache()
+    if value is None:
+        if cache[section].pop(key, None) is None:
+            return
+    else:
+        cache[section][key] = {"value": value, "ts": time.time()}
+    _save_resolve_cache()
+
+
+async def resolve_channel_id(youtube, channel_username: str):
+    """@handle -> channel id. The search costs 100 units, so results are kept on disk."""
+    cached = _cache_get("handles", channel_username.lower())
+    if cached:
+        return cached
+    res = await _safe_api_call(
+        youtube.search().list(
+            q=f"@{channel_username}",
+            type="channel",
+            part="snippet",
+            maxResults=1,
+            fields=SEARCH_FIELDS
+        )
+    )
+    channel_id = ((res or {}).get("items") or [{}])[0].get("snippet", {}).get("channelId")
+    if channel_id:
+        _cache_put("handles", channel_username.lower(), channel_id)
+    return channel_id
+
+
+async def resolve_uploads_playlist(youtube, channel_id: str):
+    cached = _cache_get("uploads", channel_id)
+    if cached:
+        return cached
+    up = await _safe_api_call(
+        youtube.channels().list(part="contentDetails", id=channel_id, fields=CHANNEL_FIELDS)
+    )
+    items = (up or {}).get("items", [])
+    if not items:
+        if up is not None:
+            print("No channel items found.")
+        return None
+    uploads_pid = items[0].get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
+    if not uploads_pid:
+        print("No uploads playlist found.")
+        return None
+    _cache_put("uploads", channel_id, uploads_pid)
+    return uploads_pid
 
 
 def build_client():
@@ -43,7 +280,13 @@ async def run_blocking(func, *args, **kwargs):
 _MARKER_START = '\u2063'
 _ZW_0 = '\u200b'
 _ZW_1 = '\u200c'
-_VALID_ZW = (_ZW_0, _ZW_1)
+
+
+# fixed-width codec: every byte is exactly 8 zero-width chars, so encoding is a
+# table lookup per byte and decoding one translate() plus int(bits, 2)
+_BYTE_TO_ZW = [format(i, "08b").translate({48: _ZW_0, 49: _ZW_1}) for i in range(256)]
+_ZW_TO_BIT = {ord(_ZW_0): "0", ord(_ZW_1): "1"}
+_NON_ZW_RE = re.compile(f"[^{_ZW_0}{_ZW_1}]+")
 
 
 def _encode_marker(t: str) -> str:
@@ -53,9 +296,7 @@ def _encode_marker(t: str) -> str:
         b = t.encode('utf-8')
     except Exception:
         b = str(t).encode('utf-8')
-    bits = ''.join(f'{byte:08b}' for byte in b)
-    zw = ''.join(_ZW_0 if bit == '0' else _ZW_1 for bit in bits)
-    return _MARKER_START + zw
+    return _MARKER_START + "".join(_BYTE_TO_ZW[byte] for byte in b)
 
 
 def _decode_marker(content: str):
@@ -63,18 +304,76 @@ def _decode_marker(content: str):
         return None
     try:
         tail = content.split(_MARKER_START, 1)[1]
-        zw_only = ''.join(ch for ch in tail if ch in _VALID_ZW)
-        if not zw_only:
-            return None
-        bits = ''.join('0' if ch == _ZW_0 else '1' for ch in zw_only)
-        if len(bits) % 8 != 0:
+        zw_only = _NON_ZW_RE.sub("", tail)
+        if not zw_only or len(zw_only) % 8 != 0:
             return None
-        bytes_list = [int(bits[i:i+8], 2) for i in range(0, len(bits), 8)]
-        return bytes(bytes_list).decode('utf-8', errors='strict')
+        bits = zw_only.translate(_ZW_TO_BIT)
+        return int(bits, 2).to_bytes(len(bits) // 8, "big").decode('utf-8', errors='strict')
     except Exception:
         return None
 
 
+class AnnouncementIndex:
+    """
+    Per announcement channel: pinned message id -> (pin type, content). Filled from
+    one pins() fetch the first time a channel is used, then kept current by our own
+    pin/unpin calls and by message delete / pins update events, so an announcement
+    costs one send, one pin and one unpin.
+    """
+
+    OWN_CHANGE_GRACE = 10  # seconds in which pins updates are assumed to be our own
+
+    def __init__(self):
+        self._channels = {}
+        self._own_change_until = {}
+        self.fetches = 0
+
+    async def pins_for(self, ch) -> dict:
+        pins = self._channels.get(ch.id)
+        if pins is None:
+            self.fetches += 1
+            pins = {}
+            for msg in await ch.pins():
+                content = msg.content or ""
+                pins[msg.id] = (_decode_marker(content) or "unknown", content)
+            self._channels[ch.id] = pins
+        return pins
+
+    def add(self, channel_id, message_id, pin_type, content):
+        self._channels.setdefault(channel_id, {})[message_id] = (pin_type, content)
+        self._own_change_until[channel_id] = time.monotonic() + self.OWN_CHANGE_GRACE
+
+    def discard(self, channel_id, message_id):
+        pins = self._channels.get(channel_id)
+        if pins is not None:
+            pins.pop(message_id, None)
+        self._own_change_until[channel_id] = time.monotonic() + self.OWN_CHANGE_GRACE
+
+    def contains(self, channel_id, message_id) -> bool:
+        return message_id in self._channels.get(channel_id, {})
+
+    def on_message_delete(self, channel_id, message_id):
+        pins = self._channels.get(channel_id)
+        if pins is not None:
+            pins.pop(message_id, None)
+
+    def on_pins_update(self, channel_id):
+        # someone else pinned/unpinned: re-read the channel's pins on next use
+        if time.monotonic() >= self._own_change_until.get(channel_id, 0):
+            self._channels.pop(channel_id, None)
+
+
+announcement_index = AnnouncementIndex()
+
+
+def is_own_pin_notice(message, bot_user) -> bool:
+    """True for the "pinned a message" notice of one of our announcements."""
+    if message.type != discord.MessageType.pins_add or message.author != bot_user:
+        return False
+    ref = message.reference
+    return bool(ref and announcement_index.contains(message.channel.id, ref.message_id))
+
+
 def _dump_snippet(s, idx, radius=400):
     start = max(0, idx - radius)
     end = min(len(s), idx + radius)
@@ -98,56 +397,114 @@ def _find_key_paths(obj, target_key, path=None):
                 return p
     return None
 
-def _fetch_community_html(channel_id=None, channel_username=None):
-    """
-    Fetch raw community HTML (used only for debugging / fallback).
-    """
-    try:
-        if channel_username:
-            url = f"https://www.youtube.com/@{channel_username}/community"
-        else:
-            url = f"https://www.youtube.com/channel/{channel_id}/community"
+_BROWSER_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+COMMUNITY_MAX_BYTES = 4 * 1024 * 1024
 
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://www.youtube.com/",
-            "Cookie": "CONSENT=YES+1"
-        }
 
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            print(f"[DEBUG] HTTP {resp.status_code} while fetching {url}")
-            return None
-        return resp.text
-    except Exception as e:
-        print("Failed to fetch community HTML:", e)
+def _community_url(channel_id=None, channel_username=None):
+    if channel_username:
+        return f"https://www.youtube.com/@{channel_username}/community"
+    return f"https://www.youtube.com/channel/{channel_id}/community"
+
+
+async def _fetch_community_html(channel_id=None, channel_username=None):
+    """
+    Fetch the channel's community page. Its embedded ytInitialData is where posts
+    are read from first; the youtubei/browse_ajax fallbacks reuse its keys.
+    """
+    headers = {
+        "User-Agent": _BROWSER_UA,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.youtube.com/",
+        "Cookie": "CONSENT=YES+1"
+    }
+    return await httpclient.fetch_text(
+        _community_url(channel_id, channel_username), headers=headers, max_size=COMMUNITY_MAX_BYTES
+    )
+
+
+_json_decoder = json.JSONDecoder()
+_INITIAL_DATA_RE = re.compile(r'ytInitialData"?\]?\s*[=:]\s*')
+_POST_RENDERER_MARKER = '"backstagePostRenderer":'
+
+
+def _decode_object_at(text, idx):
+    """Decodes the JSON object starting at (or just after whitespace from) idx, ignoring what follows it."""
+    while idx < len(text) and text[idx] in " \t\r\n":
+        idx += 1
+    if idx >= len(text) or text[idx] != "{":
         return None
+    obj, _ = _json_decoder.raw_decode(text, idx)
+    return obj
 
 
 def _parse_yt_initialdata(html):
+    # raw_decode stops at the end of the object, so no regex has to find the
+    # closing brace across a megabyte of page
     try:
-        match = re.search(r"var\s+ytInitialData\s*=\s*(\{.*?\})\s*;</script>", html, re.DOTALL)
-        if not match:
-            match = re.search(r"ytInitialData\"\s*:\s*(\{.*?\})\s*[,<]", html, re.DOTALL)
-        if not match:
-            return None
-        json_text = match.group(1)
-        return json.loads(json_text)
+        for match in _INITIAL_DATA_RE.finditer(html):
+            initial = _decode_object_at(html, match.end())
+            if isinstance(initial, dict):
+                return initial
+        return None
     except json.JSONDecodeError as e:
         print(f"[DEBUG] JSON decode error in ytInitialData: {e}")
-        snippet = _dump_snippet(html, html.find("ytInitialData"))
-        print("[DEBUG] snippet:", snippet[:1000])
+        if DEBUG_DUMPS:
+            snippet = _dump_snippet(html, html.find("ytInitialData"))
+            print("[DEBUG] snippet:", snippet[:1000])
         return None
     except Exception as e:
         print("[DEBUG] Failed to parse ytInitialData:", e)
         return None
 
 
+def _post_from_renderer(post):
+    post_id = post.get("postId", "")
+    content_runs = post.get("contentText", {}).get("runs", [])
+    title = "".join(r.get("text", "") for r in content_runs)
+    image_url = None
+
+    attachments = post.get("backstageAttachment", []) or []
+    if isinstance(attachments, dict):
+        attachments = [attachments]
+
+    for att in attachments:
+        img_thumbs = att.get("backstageImageRenderer", {}).get("image", {}).get("thumbnails", []) \
+                     or att.get("imageRenderer", {}).get("thumbnails", [])
+        if img_thumbs:
+            image_url = img_thumbs[-1].get("url")
+            break
+
+    published = post.get("publishedTimeText", {}).get("runs", [{}])[0].get("text", "")
+    return {
+        "postId": post_id,
+        "title": title,
+        "image_url": image_url,
+        "publishedAt": published
+    }
+
+
+def _extract_first_post_from_html(html):
+    """
+    Decodes only the first backstagePostRenderer object in the page (the latest
+    post), without parsing the rest of ytInitialData.
+    """
+    idx = html.find(_POST_RENDERER_MARKER)
+    if idx < 0:
+        return None
+    try:
+        post = _decode_object_at(html, idx + len(_POST_RENDERER_MARKER))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(post, dict) or not post.get("postId"):
+        return None
+    return _post_from_renderer(post)
+
+
 def _extract_latest_post_from_initialdata(initial):
     try:
         if not isinstance(initial, dict):
@@ -191,30 +548,7 @@ def _extract_latest_post_from_initialdata(initial):
             if not post:
                 continue
 
-            post_id = post.get("postId", "")
-            content_runs = post.get("contentText", {}).get("runs", [])
-            title = "".join(r.get("text", "") for r in content_runs)
-            image_url = None
-
-            attachments = post.get("backstageAttachment", []) or []
-            if isinstance(attachments, dict):
-                attachments = [attachments]
-
-            for att in attachments:
-                img_thumbs = att.get("backstageImageRenderer", {}).get("image", {}).get("thumbnails", []) \
-                             or att.get("imageRenderer", {}).get("thumbnails", [])
-                if img_thumbs:
-                    image_url = img_thumbs[-1].get("url")
-                    break
-
-            published = post.get("publishedTimeText", {}).get("runs", [{}])[0].get("text", "")
-
-            return {
-                "postId": post_id,
-                "title": title,
-                "image_url": image_url,
-                "publishedAt": published
-            }
+            return _post_from_renderer(post)
 
         return None
     except Exception as e:
@@ -222,18 +556,8 @@ def _extract_latest_post_from_initialdata(initial):
         return None
 
 
-def _fetch_community_json_browse_ajax(channel_id=None, channel_username=None):
+async def _fetch_community_json_browse_ajax(html, channel_id=None, channel_username=None):
     try:
-        html = _fetch_community_html(channel_id=channel_id, channel_username=channel_username)
-        if not html:
-            return None
-
-        try:
-            with open("/tmp/yt_community.html", "w", encoding="utf-8") as f:
-                f.write(html)
-        except Exception:
-            pass
-
         m = re.search(r'"continuationCommand"\s*:\s*\{\s*"token"\s*:\s*"([^"]+)"', html)
         if not m:
             m = re.search(r'"continuation"\s*:\s*"([^"]+)"', html)
@@ -246,39 +570,19 @@ def _fetch_community_json_browse_ajax(channel_id=None, channel_username=None):
         ajax_url = f"https://www.youtube.com/browse_ajax?continuation={continuation}"
 
         headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
+            "User-Agent": _BROWSER_UA,
             "Accept-Language": "en-US,en;q=0.9",
-            "Referer": f"https://www.youtube.com/@{channel_username}/community" if channel_username else f"https://www.youtube.com/channel/{channel_id}/community",
+            "Referer": _community_url(channel_id, channel_username),
             "Cookie": "CONSENT=YES+1"
         }
-
-        resp = requests.get(ajax_url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            print(f"[DEBUG] browse_ajax HTTP {resp.status_code}")
-            return None
-
-        return resp.json()
+        return await httpclient.fetch_json(ajax_url, headers=headers, max_size=COMMUNITY_MAX_BYTES)
     except Exception as e:
         print("[DEBUG] _fetch_community_json_browse_ajax failed:", e)
         return None
 
 
-def _fetch_community_json_youtubei(channel_id=None, channel_username=None):
+async def _fetch_community_json_youtubei(html, channel_id=None, channel_username=None):
     try:
-        html = _fetch_community_html(channel_id=channel_id, channel_username=channel_username)
-        if not html:
-            return None
-
-        try:
-            with open("/tmp/yt_community.html", "w", encoding="utf-8") as f:
-                f.write(html)
-        except Exception:
-            pass
-
         key_match = re.search(r'"INNERTUBE_API_KEY"\s*:\s*"([^"]+)"', html)
         client_match = re.search(r'"INNERTUBE_CLIENT_VERSION"\s*:\s*"([^"]+)"', html)
         if not key_match:
@@ -292,7 +596,7 @@ def _fetch_community_json_youtubei(channel_id=None, channel_username=None):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Accept-Language": "en-US,en;q=0.9",
             "Origin": "https://www.youtube.com",
-            "Referer": f"https://www.youtube.com/@{channel_username}/community" if channel_username else f"https://www.youtube.com/channel/{channel_id}/community",
+            "Referer": _community_url(channel_id, channel_username),
             "Cookie": "CONSENT=YES+1"
         }
 
@@ -306,13 +610,8 @@ def _fetch_community_json_youtubei(channel_id=None, channel_username=None):
             "browseId": channel_id or (f"@{channel_username}" if channel_username else ""),
             "params": "EgZjb21tdW5pdHk%3D"
         }
-
-        resp = requests.post(api_url, headers=headers, json=payload, timeout=10)
-        if resp.status_code != 200:
-            print(f"[DEBUG] youtubei API error {resp.status_code}")
-            return None
-
-        return resp.json()
+        return await httpclient.fetch_json(api_url, method="POST", headers=headers, json=payload,
+                                           max_size=COMMUNITY_MAX_BYTES)
     except Exception as e:
         print("[DEBUG] _fetch_community_json_youtubei failed:", e)
         return None
@@ -392,65 +691,97 @@ def _extract_latest_post_from_browse_ajax(data):
 
 
 def _find_in_structure(obj, keyname):
-    if isinstance(obj, dict):
-        if keyname in obj:
-            return obj[keyname]
-        for v in obj.values():
-            res = _find_in_structure(v, keyname)
-            if res is not None:
-                return res
-    elif isinstance(obj, list):
-        for item in obj:
-            res = _find_in_structure(item, keyname)
-            if res is not None:
-                return res
+    """Depth-first search for the first value stored under keyname; iterative, stops at the first hit."""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if keyname in node:
+                if node[keyname] is not None:
+                    return node[keyname]
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+async def _post_via_youtubei(html, channel_id, channel_username):
+    data = await _fetch_community_json_youtubei(html, channel_id, channel_username)
+    if data:
+        return _extract_latest_post_from_initialdata(data) or _extract_latest_post_from_browse_ajax(data)
+    return None
+
+
+async def _post_via_browse_ajax(html, channel_id, channel_username):
+    data = await _fetch_community_json_browse_ajax(html, channel_id, channel_username)
+    if data:
+        return _extract_latest_post_from_browse_ajax(data)
+    return None
+
+
+async def _post_via_initialdata(html):
+    post = _extract_first_post_from_html(html)
+    if post:
+        return post
+    # full parse of the embedded JSON is CPU work, keep it off the event loop
+    initial = await asyncio.to_thread(_parse_yt_initialdata, html)
+    if initial:
+        return _extract_latest_post_from_initialdata(initial)
     return None
 
-def _safe_check_latest_post(channel_id, channel_username=None):
+
+async def _first_result(coros):
+    """Runs coros concurrently; returns the first non-None result and cancels the rest."""
+    pending = {asyncio.ensure_future(c) for c in coros}
     try:
-        if IGNORE_POSTS:
-            return None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None and task.result():
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
 
-        data = _fetch_community_json_youtubei(channel_id, channel_username)
-        if data:
-            post = _extract_latest_post_from_initialdata(data) or _extract_latest_post_from_browse_ajax(data)
-            if post:
-                return post
 
-        data = _fetch_community_json_browse_ajax(channel_id, channel_username)
-        if data:
-            post = _extract_latest_post_from_browse_ajax(data)
-            if post:
-                return post
+async def _safe_check_latest_post(channel_id, channel_username=None):
+    try:
+        if IGNORE_POSTS:
+            return None
 
-        html = _fetch_community_html(channel_id=channel_id, channel_username=channel_username)
+        # one page fetch feeds every strategy
+        html = await _fetch_community_html(channel_id=channel_id, channel_username=channel_username)
         if not html:
             return None
 
-        try:
-            with open("/tmp/yt_community.html", "w", encoding="utf-8") as f:
-                f.write(html)
-        except Exception:
-            pass
-
-        initial = _parse_yt_initialdata(html)
-        if initial:
-            post = _extract_latest_post_from_initialdata(initial)
+        if DEBUG_DUMPS:
+            try:
+                DEBUG_DUMP_PATH.write_text(html, encoding="utf-8")
+            except Exception:
+                pass
+
+        # the page usually carries the post already; only go back to the network
+        # (both fallbacks raced) when it doesn't
+        post = await _post_via_initialdata(html)
+        if post:
             return post
-
-        return None
+        return await _first_result([
+            _post_via_youtubei(html, channel_id, channel_username),
+            _post_via_browse_ajax(html, channel_id, channel_username),
+        ])
     except Exception as e:
         print("safe_check_latest_post failed:", e)
         return None
 
-async def _safe_announce(bot, ch, ann, new_link, pin_type="video", file_tuple=None):
+async def _safe_announce(bot, ch, ann, new_link, pin_type="video", file_tuple=None, dedupe_pins=True):
     try:
-        pinned = await ch.pins()
-        for msg in pinned:
-            ptype = _decode_marker(msg.content or "") or "unknown"
-            if ptype == pin_type and new_link in (msg.content or ""):
-                print("Already announced (same-type pin exists).")
-                return
+        pinned = await announcement_index.pins_for(ch)
+        if dedupe_pins:
+            for ptype, content in pinned.values():
+                if ptype == pin_type and new_link in content:
+                    print("Already announced (same-type pin exists).")
+                    return
 
         send_content = ann + _encode_marker(pin_type)
 
@@ -461,32 +792,145 @@ async def _safe_announce(bot, ch, ann, new_link, pin_type="video", file_tuple=No
         else:
             sent = await ch.send(send_content)
 
-        for msg in pinned:
+        for msg_id in [mid for mid, (ptype, _) in pinned.items() if ptype == pin_type]:
             try:
-                ptype = _decode_marker(msg.content or "") or "unknown"
-                if ptype == pin_type:
-                    await msg.unpin()
+                await ch.get_partial_message(msg_id).unpin()
+                announcement_index.discard(ch.id, msg_id)
+            except discord.NotFound:
+                announcement_index.discard(ch.id, msg_id)
             except Exception as e:
                 print("Failed to unpin (type-filtered):", e)
 
         try:
+            # the "pinned a message" notice is deleted by on_message (is_own_pin_notice)
+            announcement_index.add(ch.id, sent.id, pin_type, send_content)
             await sent.pin()
-            async for msg in ch.history(limit=5):
-                if msg.type == discord.MessageType.pins_add and msg.author == bot.user:
-                    await msg.delete()
-                    break
         except Exception as e:
+            announcement_index.discard(ch.id, sent.id)
             print("Failed pin cleanup:", e)
     except Exception as e:
         print("Pinned message handling failed:", e)
 
 
-async def _safe_api_call(request, retries=5):
+def _request_kind(request) -> str:
+    # methodId looks like "youtube.playlistItems.list"
+    parts = (getattr(request, "methodId", "") or "").split(".")
+    return parts[1] if len(parts) > 2 else "unknown"
+
+
+class ApiMetrics:
+    """Per call type: count, response bytes, round-trip and JSON parse time, 304s."""
+
+    def __init__(self):
+        self._by_kind = {}
+
+    def _entry(self, kind):
+        return self._by_kind.setdefault(kind, {"calls": 0, "bytes": 0, "ms": 0.0, "parse_ms": 0.0, "not_modified": 0})
+
+    def record_response(self, kind, nbytes, parse_ms):
+        entry = self._entry(kind)
+        entry["bytes"] += nbytes
+        entry["parse_ms"] += parse_ms
+
+    def record_call(self, kind, ms, not_modified=False):
+        entry = self._entry(kind)
+        entry["calls"] += 1
+        entry["ms"] += ms
+        if not_modified:
+            entry["not_modified"] += 1
+
+    def stats(self) -> dict:
+        out = {}
+        for kind, e in self._by_kind.items():
+            calls = e["calls"] or 1
+            out[kind] = {
+                "calls": e["calls"],
+                "304": e["not_modified"],
+                "avg_bytes": round(e["bytes"] / calls),
+                "avg_ms": round(e["ms"] / calls, 1),
+                "avg_parse_ms": round(e["parse_ms"] / calls, 2),
+            }
+        return out
+
+
+api_metrics = ApiMetrics()
+_etags = OrderedDict()  # request uri -> (etag, parsed body); only touched on the event loop
+# one-off lookups (batched videos ids) never repeat a uri, so caching them only evicts useful entries
+_ETAG_SKIP = {"videos"}
+
+
+def _instrument(request, kind):
+    """
+    Wraps request.postproc to measure the body and hand back its ETag: execute()
+    then returns (etag, result). Runs on the executor thread, so it must not touch
+    _etags itself.
+    """
+    if getattr(request, "_instrumented", False):
+        return
+    original = request.postproc
+
+    def postproc(resp, content):
+        started = time.perf_counter()
+        result = original(resp, content)
+        api_metrics.record_response(kind, len(content or b""), (time.perf_counter() - started) * 1000)
+        return resp.get("etag"), result
+
+    request.postproc = postproc
+    request._instrumented = True
+
+
+def _remember_etag(uri, etag, result):
+    _etags[uri] = (etag, result)
+    _etags.move_to_end(uri)
+    while len(_etags) > ETAG_LIMIT:
+        _etags.popitem(last=False)
+
+
+_api_limiter = asyncio.Semaphore(API_CONCURRENCY)
+_http_local = threading.local()
+
+
+def _execute(request):
+    # httplib2 connections are not thread-safe; give each executor thread its own,
+    # built the same way the client library builds its default one
+    http = getattr(_http_local, "http", None)
+    if http is None:
+        http = _http_local.http = build_http()
+    return request.execute(http=http)
+
+
+async def _safe_api_call(request, retries=5, not_found=None):
+    """
+    Executes a Data API request with retries. Repeated requests are sent with
+    If-None-Match; a 304 returns the body cached with that ETag. This saves the
+    transfer and parse, not quota: the API still charges 304s. A 404 returns
+    `not_found`, so callers can tell a missing resource from a failed call.
+    """
     delay = 2
+    kind = _request_kind(request)
+    _instrument(request, kind)
+    use_etag = kind not in _ETAG_SKIP
+    cached = _etags.get(request.uri) if use_etag else None
+    if cached:
+        request.headers["If-None-Match"] = cached[0]
     for attempt in range(retries):
+        started = time.perf_counter()
         try:
-            return await run_blocking(request.execute)
+            poll_scheduler.charge(kind)
+            async with _api_limiter:
+                etag, result = await run_blocking(_execute, request)
+            api_metrics.record_call(kind, (time.perf_counter() - started) * 1000)
+            if etag and use_etag:
+                _remember_etag(request.uri, etag, result)
+            return result
         except HttpError as e:
+            if e.resp.status == 304 and cached:
+                api_metrics.record_call(kind, (time.perf_counter() - started) * 1000, not_modified=True)
+                # the entry may have been evicted while this request was in flight
+                _remember_etag(request.uri, *cached)
+                return cached[1]
+            if e.resp.status == 404 and not_found is not None:
+                return not_found
             if e.resp.status in (403, 500, 503):
                 print(f"[WARN] YouTube API error {e.resp.status}, retrying...")
                 await asyncio.sleep(delay + random.random())
@@ -501,7 +945,8 @@ async def _safe_api_call(request, retries=5):
     print("[ERROR] API call failed too many times.")
     return None
 
-def _summarize(v):
+def _summarize(v, announcements=None):
+    announcements = announcements or ANNOUNCEMENTS
     s = v.get("snippet", {})
     stat = v.get("status", {})
     live = v.get("liveStreamingDetails", {})
@@ -534,30 +979,27 @@ def _summarize(v):
         is_vertical = thumb.get("height", 0) > thumb.get("width", 0)
 
         if tot <= 180 and is_vertical:
-            return (None, None) if IGNORE_SHORTS else F(ANNOUNCEMENTS["new_short"], pin_type="video")
+            return (None, None) if IGNORE_SHORTS else F(announcements["new_short"], pin_type="video")
         else:
-            return (None, None) if IGNORE_VIDEOS else F(ANNOUNCEMENTS["new_video"], pin_type="video")
+            return (None, None) if IGNORE_VIDEOS else F(announcements["new_video"], pin_type="video")
 
     if bc == "upcoming":
         if "scheduledStartTime" in live:
             if stat.get("uploadStatus") == "processed":
-                return F(ANNOUNCEMENTS["upcoming_premiere"], pin_type="video")
-            return (None, None) if IGNORE_STREAMS else F(ANNOUNCEMENTS["upcoming_stream"], pin_type="video")
+                return F(announcements["upcoming_premiere"], pin_type="video")
+            return (None, None) if IGNORE_STREAMS else F(announcements["upcoming_stream"], pin_type="video")
 
     if bc == "live" and not IGNORE_STREAMS:
         if stat.get("uploadStatus") == "processed":
-            return F(ANNOUNCEMENTS["premiere"], pin_type="video")
-        return F(ANNOUNCEMENTS["stream"], pin_type="video")
+            return F(announcements["premiere"], pin_type="video")
+        return F(announcements["stream"], pin_type="video")
 
     return (None, None)
 
 
-def _download_image_bytes(url):
+async def _download_image_bytes(url):
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; Bot/1.0)"}
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code == 200:
-            return r.content
+        return await httpclient.fetch_bytes(url, timeout=10, max_size=IMAGE_MAX_BYTES)
     except Exception as e:
         print("Failed to download image:", e)
     return None
@@ -573,138 +1015,389 @@ async def monitor_channel(bot):
             await asyncio.sleep(10)
 
 
-async def _monitor_channel(bot):
-    await asyncio.sleep(CHECK_INTERVAL)
+def _parse_target(url: str):
+    """Channel url -> (channel_id, channel_username); one of them is None."""
+    if "/channel/" in url:
+        return url.split("/channel/")[1].split("/")[0], None
+    if "/@" in url:
+        return None, url.split("/@")[1].split("/")[0]
+    return None, url.rstrip("/").split("/")[-1]
+
+
+class Subscription:
+    """One watched YouTube channel and where/how its uploads are announced."""
+
+    def __init__(self, target: str, announcement_channel_id: int, announcements: dict | None = None):
+        self.target = target
+        self.channel_id, self.channel_username = _parse_target(target)
+        self.announcement_channel_id = announcement_channel_id
+        self.announcements = {**ANNOUNCEMENTS, **(announcements or {})}
+        self.last_video_id = None
+        self.last_post_id = None
+        self.retry_resolve_at = 0.0
+        self.last_upload_poll = 0.0
+        self.seen = deque(maxlen=SEEN_LIMIT)
+        # True once we have a local record of what was announced; until then the
+        # announcement channel's pins are the only protection against repeats
+        self.has_cursor = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.target}|{self.announcement_channel_id}"
+
+    def mark_seen(self, item_id: str):
+        if item_id not in self.seen:
+            self.seen.append(item_id)
+        self.has_cursor = True
+
+    def to_state(self) -> dict:
+        return {"last_video_id": self.last_video_id, "last_post_id": self.last_post_id, "seen": list(self.seen)}
+
+    def restore(self, data: dict):
+        self.last_video_id = data.get("last_video_id")
+        self.last_post_id = data.get("last_post_id")
+        self.seen.extend(data.get("seen") or [])
+        self.has_cursor = True
+
+    def __repr__(self):
+        return f"<Subscription {self.target} -> {self.announcement_channel_id}>"
+
+
+_state = None
 
-    channel_id = None
-    channel_username = None
-    if "/channel/" in CHANNEL_URL:
-        channel_id = CHANNEL_URL.split("/channel/")[1].split("/")[0]
-    else:
-        if "/@" in CHANNEL_URL:
-            channel_username = CHANNEL_URL.split("/@")[1].split("/")[0]
-        else:
-            channel_username = CHANNEL_URL.rstrip("/").split("/")[-1]
 
+def _load_state() -> dict:
+    global _state
+    if _state is None:
         try:
-            youtube_tmp = build_client()
-            res = await run_blocking(
-                youtube_tmp.search().list(
-                    q=f"@{channel_username}",
-                    type="channel",
-                    part="snippet",
-                    maxResults=1
-                ).execute
-            )
-            channel_id = res.get("items", [{}])[0].get("snippet", {}).get("channelId")
-            if not channel_id:
-                print("Could not resolve channel ID for", channel_username)
-                return
+            with STATE_PATH.open("r", encoding="utf-8") as f:
+                _state = json.load(f)
+        except FileNotFoundError:
+            _state = {}
         except Exception as e:
-            print("YouTube monitor error while resolving channel:", e)
-            return
+            print(f"Failed to load {STATE_PATH.name}: {e}")
+            _state = {}
+    return _state
 
-    last_video_id = None
-    last_post_id = None
-    youtube = build_client()
 
-    while True:
+def restore_state(subs):
+    state = _load_state()
+    for sub in subs:
+        if sub.key in state:
+            sub.restore(state[sub.key])
+
+
+def save_state(subs):
+    state = _load_state()
+    for sub in subs:
+        if sub.has_cursor:
+            state[sub.key] = sub.to_state()
+    try:
+        tmp = STATE_PATH.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        tmp.replace(STATE_PATH)
+    except Exception as e:
+        print(f"Failed to save {STATE_PATH.name}: {e}")
+
+
+def load_subscriptions() -> list:
+    """
+    youtube.subscriptions entries ({target, announcement_channel, announcements});
+    falls back to the single youtube.target / ANNOUNCEMENT_CHANNEL_ID pair.
+    """
+    try:
+        raw = get_value("youtube", "subscriptions")
+    except KeyError:
+        raw = None
+
+    subs = []
+    for entry in raw or []:
+        if not isinstance(entry, dict) or not entry.get("target"):
+            print(f"[yt] skipping malformed subscription: {entry!r}")
+            continue
         try:
-            up = await _safe_api_call(
-                youtube.channels().list(part="contentDetails", id=channel_id)
-            )
-            if not up:
-                await asyncio.sleep(CHECK_INTERVAL)
-                continue
+            ann_id = int(entry.get("announcement_channel") or ANNOUNCEMENT_CHANNEL_ID)
+        except (TypeError, ValueError):
+            print(f"[yt] subscription {entry['target']} has no valid announcement_channel")
+            continue
+        subs.append(Subscription(entry["target"], ann_id, entry.get("announcements")))
+
+    if not subs:
+        subs.append(Subscription(CHANNEL_URL, ANNOUNCEMENT_CHANNEL_ID))
+    return subs
+
+
+push_receiver = None
+# push notifications and the poll cycle can both pick up the same new upload
+_announce_lock = asyncio.Lock()
+
+
+async def _monitor_channel(bot):
+    global push_receiver
+    await asyncio.sleep(CHECK_INTERVAL)
+
+    subs = load_subscriptions()
+    restore_state(subs)
+    youtube = build_client()
+
+    if WEBSUB_ENABLED and push_receiver is None:
+        push_receiver = await _start_push(bot, youtube, subs)
+
+    try:
+        while True:
+            started = time.perf_counter()
+            changed = False
+            try:
+                changed = await _poll_cycle(bot, youtube, subs)
+            except Exception as e:
+                print("[ERROR] YouTube monitor inner loop error:", e)
+                youtube = build_client()
+            poll_scheduler.record_poll(changed, time.perf_counter() - started)
+            await poll_scheduler.wait()
+    finally:
+        if push_receiver is not None:
+            receiver, push_receiver = push_receiver, None
+            await receiver.stop()
 
-            uploads = up.get("items", [])
-            if not uploads:
-                print("No channel items found.")
-                await asyncio.sleep(CHECK_INTERVAL)
-                continue
 
-            content_details = uploads[0].get("contentDetails", {})
-            related = content_details.get("relatedPlaylists", {})
-            uploads_pid = related.get("uploads")
-            if not uploads_pid:
-                print("No uploads playlist found.")
-                await asyncio.sleep(CHECK_INTERVAL)
+async def _start_push(bot, youtube, subs):
+    """
+    Starts the WebSub receiver and subscribes every resolved channel. Pushed videos
+    go through the same lookup/announce path as polling. A subscription whose topic
+    has a current verified lease is only polled for uploads every
+    WEBSUB_FALLBACK_INTERVAL (see _upload_poll_due); all others keep the normal pace.
+    """
+    if not WEBSUB_CALLBACK_URL:
+        print("[yt] websub enabled but CALLBACK_URL is empty, polling only")
+        return None
+    if not WEBSUB_SECRET:
+        # without a secret anyone who finds the callback URL can post notifications
+        print("[yt] websub enabled but SECRET is empty, refusing to start push mode; polling only")
+        return None
+
+    async def on_videos(entries):
+        fresh = {}
+        for channel_id, vid, published in entries:
+            if not websub.is_recent(published, PUSH_MAX_AGE):
                 continue
+            for sub in subs:
+                if sub.channel_id == channel_id and vid != sub.last_video_id and vid not in sub.seen:
+                    fresh.setdefault(vid, []).append(sub)
+        await _announce_fresh(bot, youtube, fresh, subs, pushed=True)
+
+    receiver = websub.WebSubReceiver(
+        on_videos,
+        callback_url=WEBSUB_CALLBACK_URL,
+        secret=WEBSUB_SECRET,
+        hub_url=WEBSUB_HUB_URL,
+        host=WEBSUB_HOST,
+        port=WEBSUB_PORT,
+        path=WEBSUB_PATH,
+    )
+    try:
+        await receiver.start()
+    except OSError as e:
+        print(f"[yt] could not start websub receiver, polling only: {e}")
+        return None
+
+    await asyncio.gather(*(_resolve_subscription(youtube, sub) for sub in subs))
+    accepted = await receiver.subscribe_all([sub.channel_id for sub in subs if sub.channel_id])
+    if not accepted:
+        print("[yt] websub hub accepted no subscriptions, polling at the normal interval")
+    return receiver
+
+
+def _upload_poll_due(sub, now: float) -> bool:
+    # a wrong CALLBACK_URL still gets 202 from the hub, so only a verified lease that
+    # hasn't run out proves pushes reach us; without one the channel is polled normally
+    if push_receiver is None or not sub.channel_id or not push_receiver.is_verified(sub.channel_id):
+        return True
+    return now - sub.last_upload_poll >= WEBSUB_FALLBACK_INTERVAL
 
-            pl = await _safe_api_call(
-                youtube.playlistItems().list(
-                    part="snippet,contentDetails",
-                    playlistId=uploads_pid,
-                    maxResults=1
-                )
-            )
-            if pl:
-                items = pl.get("items", [])
-            else:
-                items = []
-
-            if items:
-                vid = items[0].get("contentDetails", {}).get("videoId")
-                if vid:
-                    if vid != last_video_id:
-                        v = await _safe_api_call(
-                            youtube.videos().list(
-                                part="snippet,liveStreamingDetails,status,contentDetails",
-                                id=vid
-                            )
-                        )
-                        if v:
-                            v_items = v.get("items", [])
-                            if v_items:
-                                v = v_items[0]
-                                ann_tuple = _summarize(v)
-                                if ann_tuple:
-                                    ann_text, pin_type = ann_tuple
-                                    if ann_text:
-                                        ch = bot.get_channel(ANNOUNCEMENT_CHANNEL_ID)
-                                        if ch:
-                                            new_link = f"https://www.youtube.com/watch?v={vid}"
-                                            await _safe_announce(bot, ch, ann_text, new_link, pin_type)
-                                        else:
-                                            print(f"Channel {ANNOUNCEMENT_CHANNEL_ID} not found.")
-                        last_video_id = vid
-
-            if not IGNORE_POSTS:
-                post = await run_blocking(_safe_check_latest_post, channel_id, channel_username)
-                print(f"[DEBUG] Post check result: {post}")
-                if post:
-                    post_id = post.get("postId")
-                    if post_id and post_id != last_post_id:
-                        title = post.get("title", "")
-                        post_link = f"https://www.youtube.com/post/{post_id}"
-                        ann_template = ANNOUNCEMENTS.get("new_post", "{PING_everyone} ... has made a new [post]({target_video_link})!\n**# {title}**\n{image}")
-                        prem = post.get("publishedAt", "")
-                        ann_text = ann_template.format(
-                            PING_everyone="@everyone",
-                            target_video_link=post_link,
-                            title=title,
-                            description=post.get("description", ""),
-                            premiere_date=prem,
-                            image=""
-                        )
-
-                        ch = bot.get_channel(ANNOUNCEMENT_CHANNEL_ID)
-                        if ch:
-                            image_url = post.get("image_url")
-                            file_tuple = None
-                            if image_url:
-                                img_bytes = await run_blocking(_download_image_bytes, image_url)
-                                if img_bytes:
-                                    file_tuple = (img_bytes, "post.jpg")
-
-                            await _safe_announce(bot, ch, ann_text, post_link, "post", file_tuple=file_tuple)
-                        else:
-                            print(f"Channel {ANNOUNCEMENT_CHANNEL_ID} not found (post).")
-
-                        last_post_id = post_id
 
+async def _poll_cycle(bot, youtube, subs) -> bool:
+    """
+    One monitor cycle over every subscription: latest uploads are fetched
+    concurrently, then all new video ids go out in batched videos().list calls.
+    Channels covered by a verified WebSub lease skip the upload check until their
+    fallback poll is due. Returns True if a new upload or post was seen.
+    """
+    resolved = await asyncio.gather(*(_resolve_subscription(youtube, sub) for sub in subs))
+    ready = [sub for sub, pid in zip(subs, resolved) if pid]
+    now = time.monotonic()
+    due = [(sub, pid) for sub, pid in zip(subs, resolved) if pid and _upload_poll_due(sub, now)]
+    latest = await asyncio.gather(*(_latest_upload(youtube, sub, pid) for sub, pid in due))
+
+    fresh = {}
+    for (sub, _), vid in zip(due, latest):
+        sub.last_upload_poll = now
+        if not vid or vid == sub.last_video_id:
+            continue
+        if vid in sub.seen:
+            # already announced before (e.g. a newer upload was deleted); just move the cursor
+            sub.last_video_id = vid
+            continue
+        fresh.setdefault(vid, []).append(sub)
+
+    await _announce_fresh(bot, youtube, fresh, subs)
+
+    posts_changed = False
+    if not IGNORE_POSTS:
+        results = await asyncio.gather(*(_check_posts(bot, sub) for sub in ready))
+        posts_changed = any(results)
+        if posts_changed:
+            save_state(subs)
+
+    return bool(fresh) or posts_changed
+
+
+async def _announce_fresh(bot, youtube, fresh: dict, subs, pushed=False):
+    """
+    fresh maps new video id -> subscriptions watching it. A video is only
+    announced for subscriptions whose channel actually owns it. Pushed ids come
+    from an unauthenticated notification, so one the API doesn't return is
+    dropped instead of moving the cursor.
+    """
+    async with _announce_lock:
+        # whoever gets the lock second drops ids the other path already announced
+        fresh = {vid: [sub for sub in watchers if vid not in sub.seen] for vid, watchers in fresh.items()}
+        fresh = {vid: watchers for vid, watchers in fresh.items() if watchers}
+        if not fresh:
+            return
+        videos = await _fetch_videos(youtube, list(fresh))
+        for vid, watchers in fresh.items():
+            v = videos.get(vid)
+            if v is None and pushed:
+                print(f"[yt] pushed video {vid} not found, ignoring")
+                continue
+            for sub in watchers:
+                owner = v.get("snippet", {}).get("channelId") if v else None
+                if v and owner != sub.channel_id:
+                    print(f"[yt] video {vid} belongs to {owner}, not {sub.channel_id}; not announcing")
+                    continue
+                if v:
+                    await _announce_video(bot, sub, v)
+                sub.last_video_id = vid
+                sub.mark_seen(vid)
+        save_state(subs)
+
+
+async def _resolve_subscription(youtube, sub):
+    """Returns the uploads playlist id for `sub`, or None if it can't be resolved yet."""
+    if not sub.channel_id:
+        # a failed search costs 100 units, so don't repeat it every cycle
+        if time.monotonic() < sub.retry_resolve_at:
+            return None
+        try:
+            sub.channel_id = await resolve_channel_id(youtube, sub.channel_username)
         except Exception as e:
-            print("[ERROR] YouTube monitor inner loop error:", e)
-            youtube = build_client()
+            print(f"YouTube monitor error while resolving {sub.target}:", e)
+        if not sub.channel_id:
+            print("Could not resolve channel ID for", sub.channel_username)
+            sub.retry_resolve_at = time.monotonic() + RESOLVE_RETRY
+            return None
+    return await resolve_uploads_playlist(youtube, sub.channel_id)
+
+
+_NOT_FOUND = object()
+
+
+async def _latest_upload(youtube, sub, uploads_pid):
+    pl = await _safe_api_call(
+        youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=uploads_pid,
+            maxResults=1,
+            fields=PLAYLIST_FIELDS
+        ),
+        not_found=_NOT_FOUND
+    )
+    if pl is _NOT_FOUND:
+        # playlistNotFound: drop the cached id so it is looked up again next cycle
+        print(f"[yt] uploads playlist {uploads_pid} not found, resolving {sub.target} again")
+        _cache_put("uploads", sub.channel_id, None)
+        return None
+    if not pl:
+        # failed call, or an empty playlist (the fields projection returns {}): nothing new
+        return None
+    items = pl.get("items", [])
+    if not items:
+        return None
+    return items[0].get("contentDetails", {}).get("videoId")
+
+
+async def _fetch_videos(youtube, ids) -> dict:
+    chunks = [ids[i:i + VIDEOS_BATCH] for i in range(0, len(ids), VIDEOS_BATCH)]
+    responses = await asyncio.gather(*(
+        _safe_api_call(
+            youtube.videos().list(
+                part="snippet,liveStreamingDetails,status,contentDetails",
+                id=",".join(chunk),
+                fields=VIDEO_FIELDS
+            )
+        )
+        for chunk in chunks
+    ))
+    videos = {}
+    for res in responses:
+        for item in (res or {}).get("items", []):
+            videos[item.get("id")] = item
+    return videos
+
+
+async def _announce_video(bot, sub, v):
+    ann_text, pin_type = _summarize(v, sub.announcements)
+    if not ann_text:
+        return
+    ch = bot.get_channel(sub.announcement_channel_id)
+    if not ch:
+        print(f"Channel {sub.announcement_channel_id} not found.")
+        return
+    new_link = f"https://www.youtube.com/watch?v={v.get('id')}"
+    await _safe_announce(bot, ch, ann_text, new_link, pin_type, dedupe_pins=not sub.has_cursor)
+
+
+async def _check_posts(bot, sub) -> bool:
+    post = await _safe_check_latest_post(sub.channel_id, sub.channel_username)
+    if DEBUG_DUMPS:
+        print(f"[DEBUG] Post check result: {post}")
+    if not post:
+        return False
+    post_id = post.get("postId")
+    if not post_id or post_id == sub.last_post_id:
+        return False
+    if post_id in sub.seen:
+        sub.last_post_id = post_id
+        return False
+
+    title = post.get("title", "")
+    post_link = f"https://www.youtube.com/post/{post_id}"
+    ann_template = sub.announcements.get("new_post", "{PING_everyone} ... has made a new [post]({target_video_link})!\n**# {title}**\n{image}")
+    prem = post.get("publishedAt", "")
+    ann_text = ann_template.format(
+        PING_everyone="@everyone",
+        target_video_link=post_link,
+        title=title,
+        description=post.get("description", ""),
+        premiere_date=prem,
+        image=""
+    )
+
+    ch = bot.get_channel(sub.announcement_channel_id)
+    if ch:
+        image_url = post.get("image_url")
+        file_tuple = None
+        if image_url:
+            img_bytes = await _download_image_bytes(image_url)
+            if img_bytes:
+                file_tuple = (img_bytes, "post.jpg")
+
+        await _safe_announce(bot, ch, ann_text, post_link, "post", file_tuple=file_tuple,
+                             dedupe_pins=not sub.has_cursor)
+    else:
+        print(f"Channel {sub.announcement_channel_id} not found (post).")
 
-        await asyncio.sleep(CHECK_INTERVAL)
\ No newline at end of file
+    sub.last_post_id = post_id
+    sub.mark_seen(post_id)
+    return True
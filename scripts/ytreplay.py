@@ -0,0 +1,692 @@
+# PerfectionBot/scripts/ytreplay.py
+#
+# Offline replay harness for the YouTube monitor. Drives yt._monitor_channel
+# against a fake Data API client, canned community pages and fake Discord
+# channels, then reports loop iterations, quota units, thread-pool hops and
+# announcement latency per scenario. The websub scenario also runs the push
+# receiver against an in-process fake hub on localhost and exits non-zero if any
+# of its checks fail. No API key, network or bot login needed.
+#
+#   python -m PerfectionBot.scripts.ytreplay
+#   python -m PerfectionBot.scripts.ytreplay uploads multi_channel --latency 50
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import secrets
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httplib2
+from aiohttp import web
+from googleapiclient.errors import HttpError
+
+from PerfectionBot.scripts import httpclient, websub, yt
+
+
+# ---------------------------------------------------------------- fake API
+
+class FakeRequest:
+    """Stands in for googleapiclient's HttpRequest: methodId, uri, headers, postproc, execute()."""
+
+    def __init__(self, api, resource, params):
+        self.api = api
+        self.resource = resource
+        self.params = params
+        self.methodId = f"youtube.{resource}.list"
+        self.uri = f"fake://{resource}?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        self.headers = {}
+        self.postproc = lambda resp, content: json.loads(content)
+
+    def execute(self, http=None):
+        time.sleep(self.api.latency)
+        with self.api.lock:
+            body = getattr(self.api, f"_{self.resource}")(**self.params)
+        content = json.dumps(body).encode("utf-8")
+        etag = f'"{hash(content) & 0xffffffff:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            raise HttpError(httplib2.Response({"status": 304}), b"")
+        return self.postproc(httplib2.Response({"status": 200, "etag": etag}), content)
+
+
+class _Resource:
+    def __init__(self, api, name):
+        self._api = api
+        self._name = name
+
+    def list(self, **params):
+        return FakeRequest(self._api, self._name, params)
+
+
+class FakeYouTube:
+    """
+    In-memory YouTube: channels keyed by id, each with a handle and an upload list
+    (newest first). Returns the same shapes as the Data API v3 for the calls
+    yt.py makes.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.channel_table = {}
+        self.video_table = {}
+
+    def add_channel(self, channel_id, handle):
+        self.channel_table[channel_id] = {"handle": handle, "uploads": []}
+
+    def publish(self, channel_id, video):
+        video["snippet"]["channelId"] = channel_id
+        self.video_table[video["id"]] = video
+        self.channel_table[channel_id]["uploads"].insert(0, video["id"])
+
+    def _search(self, q, **_):
+        for cid, ch in self.channel_table.items():
+            if f"@{ch['handle']}" == q:
+                return {"items": [{"snippet": {"channelId": cid}}]}
+        return {"items": []}
+
+    def _channels(self, id, **_):
+        if id not in self.channel_table:
+            return {"items": []}
+        return {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": "UU" + id[2:]}}}]}
+
+    def _playlistItems(self, playlistId, **_):
+        uploads = self.channel_table.get("UC" + playlistId[2:], {}).get("uploads", [])
+        return {"items": [{"contentDetails": {"videoId": vid}} for vid in uploads[:1]]}
+
+    def _videos(self, id, **_):
+        return {"items": [self.video_table[vid] for vid in id.split(",") if vid in self.video_table]}
+
+
+class _ApiView:
+    """What yt.py sees as the discovery client (youtube.search(), .channels(), ...)."""
+
+    def __init__(self, api):
+        self._api = api
+
+    def search(self):
+        return _Resource(self._api, "search")
+
+    def channels(self):
+        return _Resource(self._api, "channels")
+
+    def playlistItems(self):
+        return _Resource(self._api, "playlistItems")
+
+    def videos(self):
+        return _Resource(self._api, "videos")
+
+
+_ids = itertools.count(1)
+
+
+def make_video(kind: str, title: str) -> dict:
+    """kind: video, short, premiere, upcoming_premiere, stream, upcoming_stream."""
+    vid = f"vid{next(_ids):05d}"
+    wide = {"width": 480, "height": 360}
+    tall = {"width": 360, "height": 480}
+    video = {
+        "id": vid,
+        "snippet": {"title": title, "description": f"{kind} description", "publishedAt": "2026-01-01T12:00:00Z",
+                    "liveBroadcastContent": "none", "thumbnails": {"high": wide}},
+        "contentDetails": {"duration": "PT12M3S"},
+        "status": {"uploadStatus": "uploaded"},
+        "liveStreamingDetails": {},
+    }
+    if kind == "short":
+        video["contentDetails"]["duration"] = "PT45S"
+        video["snippet"]["thumbnails"]["high"] = tall
+    elif kind in ("upcoming_premiere", "upcoming_stream"):
+        video["snippet"]["liveBroadcastContent"] = "upcoming"
+        video["liveStreamingDetails"]["scheduledStartTime"] = "2026-01-02T18:00:00Z"
+    elif kind in ("premiere", "stream"):
+        video["snippet"]["liveBroadcastContent"] = "live"
+    if kind in ("premiere", "upcoming_premiere"):
+        video["status"]["uploadStatus"] = "processed"
+    return video
+
+
+def make_community_html(posts: list, padding: int = 500_000) -> str:
+    """Community page with ytInitialData holding `posts` (newest first) and some bulk around it."""
+    threads = [{
+        "backstagePostThreadRenderer": {"post": {"backstagePostRenderer": {
+            "postId": post_id,
+            "contentText": {"runs": [{"text": text}]},
+            "publishedTimeText": {"runs": [{"text": "1 hour ago"}]},
+        }}}
+    } for post_id, text in posts]
+    initial = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [
+        {"tabRenderer": {"title": "Home"}},
+        {"tabRenderer": {"content": {"sectionListRenderer": {"contents": threads}}}},
+    ]}}}
+    filler = "<div>" + "x" * (padding // 2) + "</div>"
+    return f"<html>{filler}<script>var ytInitialData = {json.dumps(initial)};</script>{filler}</html>"
+
+
+# ---------------------------------------------------------------- fake WebSub hub
+
+ATOM_ENTRY = """<?xml version='1.0' encoding='UTF-8'?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+<entry><id>yt:video:{video_id}</id><yt:videoId>{video_id}</yt:videoId><yt:channelId>{channel_id}</yt:channelId>
+<title>replay</title><published>{published}</published></entry></feed>"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeHub:
+    """
+    In-process WebSub hub. Accepts subscribe/unsubscribe with 202, then verifies
+    them against the callback with a challenge like the real hub does, and pushes
+    Atom notifications signed with the subscriber's secret, a wrong one, or none.
+    """
+
+    def __init__(self, lease_seconds: int = 3600):
+        self.lease_seconds = lease_seconds
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/hub"
+        self.requests = []
+        self.verifications = []  # (mode, topic, confirmed)
+        self.hub_secrets = {}    # topic -> hub.secret from the subscribe request
+        self._runner = None
+        self._tasks = set()
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/hub", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request):
+        form = await request.post()
+        self.requests.append(dict(form))
+        self.hub_secrets[form["hub.topic"]] = form.get("hub.secret", "")
+        task = asyncio.create_task(self.verify(form["hub.callback"], form["hub.mode"], form["hub.topic"]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(status=202)
+
+    async def verify(self, callback: str, mode: str, topic: str) -> bool:
+        """Sends a verification GET; True if the subscriber echoed the challenge."""
+        challenge = secrets.token_hex(8)
+        params = {"hub.mode": mode, "hub.topic": topic, "hub.challenge": challenge,
+                  "hub.lease_seconds": str(self.lease_seconds)}
+        async with httpclient.get_session().get(callback, params=params) as resp:
+            confirmed = resp.status == 200 and await resp.text() == challenge
+        self.verifications.append((mode, topic, confirmed))
+        return confirmed
+
+    async def push(self, callback: str, channel_id: str, video_id: str, published: datetime,
+                   signature: str = "valid") -> int:
+        """signature: "valid" (subscriber's secret), "forged" (another secret) or "missing"."""
+        body = ATOM_ENTRY.format(video_id=video_id, channel_id=channel_id, published=published.isoformat()).encode()
+        headers = {"Content-Type": "application/atom+xml"}
+        if signature != "missing":
+            secret = self.hub_secrets.get(websub.topic_for(channel_id), "")
+            if signature == "forged":
+                secret = "not-" + secret
+            headers["X-Hub-Signature"] = "sha1=" + hmac.new(secret.encode(), body, hashlib.sha1).hexdigest()
+        async with httpclient.get_session().post(callback, data=body, headers=headers) as resp:
+            return resp.status
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+
+# ---------------------------------------------------------------- fake Discord
+
+class FakeMessage:
+    def __init__(self, channel, message_id, content):
+        self.channel = channel
+        self.id = message_id
+        self.content = content
+
+    async def pin(self):
+        self.channel.ops["pin"] += 1
+        self.channel.pinned[self.id] = self
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def unpin(self):
+        self.channel.ops["unpin"] += 1
+        self.channel.pinned.pop(self.id, None)
+
+
+class FakeChannel:
+    def __init__(self, channel_id, harness):
+        self.id = channel_id
+        self.harness = harness
+        self.pinned = {}
+        self.sent = []
+        self.ops = {"send": 0, "pin": 0, "unpin": 0, "pins": 0}
+
+    async def pins(self):
+        self.ops["pins"] += 1
+        return list(self.pinned.values())
+
+    async def send(self, content=None, file=None):
+        self.ops["send"] += 1
+        self.sent.append(content)
+        self.harness.on_announce(content)
+        return FakeMessage(self, next(_ids), content)
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self, message_id)
+
+
+class FakeBot:
+    def __init__(self):
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Default executor that counts every run_in_executor / to_thread hop."""
+
+    def __init__(self):
+        super().__init__(max_workers=8, thread_name_prefix="replay")
+        self.hops = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.hops += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+# ---------------------------------------------------------------- harness
+
+class _ReplayDone(Exception):
+    pass
+
+
+class Replay:
+    """
+    Runs one scenario: `steps` is a list of callables applied to the harness
+    before each poll (None = nothing happens); a step may be a coroutine function.
+    The monitor's sleep between polls is replaced by stepping the script, so the
+    loop runs as fast as the fakes allow. With `hub`, push mode is on and steps
+    can record pass/fail checks.
+    """
+
+    def __init__(self, name, subs, steps, api, posts=False, restart_after=None, hub=None):
+        self.name = name
+        self.subs_spec = subs
+        self.steps = steps
+        self.api = api
+        self.posts = posts
+        self.restart_after = restart_after
+        self.bot = FakeBot()
+        self.community = {}
+        self.pending = {}
+        self.latencies = []
+        self.iterations = 0
+        self.expected = 0
+        self.hub = hub
+        self.receiver = None
+        self.checks = []
+
+    # called by scenario steps
+    def upload(self, channel_id, kind, title):
+        video = make_video(kind, title)
+        self.api.publish(channel_id, video)
+        self.pending[video["id"]] = time.perf_counter()
+        self.expected += 1
+
+    def post(self, channel_id, post_id, text):
+        self.community.setdefault(channel_id, []).insert(0, (post_id, text))
+        self.pending[post_id] = time.perf_counter()
+        self.expected += 1
+
+    def check(self, name, ok):
+        self.checks.append((name, bool(ok)))
+
+    def announcements_of(self, item_id) -> int:
+        return sum(item_id in (content or "") for ch in self.bot.channels.values() for content in ch.sent)
+
+    async def settle(self, timeout: float = 2.0):
+        """Waits for pending hub verifications and pushed-video handling to finish."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            receiver_busy = self.receiver is not None and self.receiver._tasks
+            if not self.hub.busy and not receiver_busy:
+                return
+            await asyncio.sleep(0.01)
+
+    def on_announce(self, content):
+        for item_id, started in list(self.pending.items()):
+            if item_id in content:
+                self.latencies.append((time.perf_counter() - started) * 1000)
+                del self.pending[item_id]
+
+    def _reset_module_state(self, tmp: Path):
+        yt.RESOLVE_CACHE_PATH = tmp / "yt_resolve.json"
+        yt.STATE_PATH = tmp / "yt_state.json"
+        yt._resolve_cache = None
+        yt._state = None
+        yt._etags = yt.OrderedDict()
+        yt.api_metrics = yt.ApiMetrics()
+        yt.announcement_index = yt.AnnouncementIndex()
+        yt.poll_scheduler = yt.PollScheduler(yt.CHECK_INTERVAL, yt.DAILY_QUOTA, yt.MAX_INTERVAL)
+        yt._api_limiter = asyncio.Semaphore(yt.API_CONCURRENCY)
+        yt._announce_lock = asyncio.Lock()
+        yt.CHECK_INTERVAL = 0
+        yt.IGNORE_POSTS = not self.posts
+        yt.WEBSUB_ENABLED = self.hub is not None
+        yt.push_receiver = None
+        yt.DEBUG_DUMPS = False
+        if self.hub is not None:
+            port = _free_port()
+            yt.WEBSUB_HOST = "127.0.0.1"
+            yt.WEBSUB_PORT = port
+            yt.WEBSUB_PATH = "/websub"
+            yt.WEBSUB_CALLBACK_URL = f"http://127.0.0.1:{port}/websub"
+            yt.WEBSUB_SECRET = "replay-secret"
+            yt.WEBSUB_HUB_URL = self.hub.url
+
+    def _install_fakes(self):
+        yt.build_client = lambda: _ApiView(self.api)
+        yt.load_subscriptions = lambda: [yt.Subscription(target, ann_id) for target, ann_id in self.subs_spec]
+
+        async def fetch_html(channel_id=None, channel_username=None):
+            return make_community_html(self.community.get(channel_id, []))
+
+        async def no_json(*args, **kwargs):
+            return None
+
+        async def image(url):
+            return b"\x89PNG"
+
+        yt._fetch_community_html = fetch_html
+        yt._fetch_community_json_youtubei = no_json
+        yt._fetch_community_json_browse_ajax = no_json
+        yt._download_image_bytes = image
+
+    async def _run_monitor(self, step_iter):
+        async def wait():
+            self.iterations += 1
+            if self.restart_after is not None and self.iterations == self.restart_after:
+                raise _ReplayDone("restart")
+            step = next(step_iter, _ReplayDone)
+            if step is _ReplayDone:
+                raise _ReplayDone("done")
+            if step:
+                result = step(self)
+                if asyncio.iscoroutine(result):
+                    await result
+
+        yt.poll_scheduler.wait = wait
+        try:
+            await yt._monitor_channel(self.bot)
+        except _ReplayDone as e:
+            return str(e)
+
+    async def run(self) -> dict:
+        loop = asyncio.get_running_loop()
+        executor = CountingExecutor()
+        loop.set_default_executor(executor)
+        for _, ann_id in self.subs_spec:
+            self.bot.channels.setdefault(ann_id, FakeChannel(ann_id, self))
+
+        if self.hub is not None:
+            await self.hub.start()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self._reset_module_state(Path(tmp))
+            self._install_fakes()
+            started = time.perf_counter()
+            step_iter = iter(self.steps)
+            restarts = 0
+            while await self._run_monitor(step_iter) == "restart":
+                # simulate a process restart: in-memory state gone, data/ files kept
+                restarts += 1
+                self.restart_after = None
+                yt._state = None
+                yt._resolve_cache = None
+                yt.announcement_index = yt.AnnouncementIndex()
+            wall_ms = (time.perf_counter() - started) * 1000
+
+        if self.hub is not None:
+            await self.hub.stop()
+            await httpclient.close()
+
+        sent = sum(len(ch.sent) for ch in self.bot.channels.values())
+        ops = {k: sum(ch.ops[k] for ch in self.bot.channels.values()) for k in ("send", "pin", "unpin", "pins")}
+        lat = sorted(self.latencies)
+        api = yt.api_metrics.stats()
+        return {
+            "scenario": self.name,
+            "iterations": self.iterations,
+            "restarts": restarts,
+            "quota": yt.poll_scheduler.used_today,
+            "units": dict(yt.poll_scheduler.units),
+            "api_calls": sum(v["calls"] for v in api.values()),
+            "not_modified": sum(v["304"] for v in api.values()),
+            "thread_hops": executor.hops,
+            "announced": f"{sent}/{self.expected}",
+            "discord_ops": ops,
+            "latency_avg_ms": round(sum(lat) / len(lat), 1) if lat else 0,
+            "latency_max_ms": round(lat[-1], 1) if lat else 0,
+            "wall_ms": round(wall_ms, 1),
+            "checks": f"{sum(ok for _, ok in self.checks)}/{len(self.checks)}" if self.checks else "-",
+            "failed_checks": [name for name, ok in self.checks if not ok],
+        }
+
+
+# ---------------------------------------------------------------- scenarios
+
+def _single(api):
+    api.add_channel("UCreplay0", "replay0")
+    return [("https://www.youtube.com/@replay0", 1000)]
+
+
+def scenario_quiet(api):
+    subs = _single(api)
+    return Replay("quiet", subs, [None] * 20, api)
+
+
+def scenario_uploads(api):
+    subs = _single(api)
+    steps = [
+        None,
+        lambda r: r.upload("UCreplay0", "video", "First video"),
+        None,
+        lambda r: r.upload("UCreplay0", "short", "A short"),
+        None, None,
+        lambda r: r.upload("UCreplay0", "video", "Second video"),
+        None,
+    ]
+    return Replay("uploads", subs, steps, api)
+
+
+def scenario_live(api):
+    subs = _single(api)
+    steps = [
+        None,
+        lambda r: r.upload("UCreplay0", "upcoming_premiere", "Premiere soon"),
+        None,
+        lambda r: r.upload("UCreplay0", "upcoming_stream", "Stream tonight"),
+        None,
+        lambda r: r.upload("UCreplay0", "stream", "Live now"),
+        None,
+    ]
+    return Replay("premieres_streams", subs, steps, api)
+
+
+def scenario_posts(api):
+    subs = _single(api)
+    steps = [
+        None,
+        lambda r: r.post("UCreplay0", "UgkxReplayPost1", "First community post"),
+        None,
+        lambda r: r.post("UCreplay0", "UgkxReplayPost2", "Second community post"),
+        None,
+    ]
+    return Replay("posts", subs, steps, api, posts=True)
+
+
+def scenario_multi_channel(api, channels=25):
+    subs = []
+    for i in range(channels):
+        api.add_channel(f"UCmulti{i}", f"multi{i}")
+        subs.append((f"https://www.youtube.com/@multi{i}", 2000 + i % 5))
+
+    def burst(r):
+        for i in range(0, channels, 2):
+            r.upload(f"UCmulti{i}", "video", f"Burst upload {i}")
+
+    return Replay("multi_channel", subs, [None, burst, None, None], api)
+
+
+def scenario_restart(api):
+    subs = _single(api)
+    steps = [
+        None,
+        lambda r: r.upload("UCreplay0", "video", "Before restart"),
+        None, None,
+        None, None,
+    ]
+    return Replay("restart", subs, steps, api, restart_after=3)
+
+
+def scenario_websub(api):
+    """
+    Push path end to end: the fake hub verifies our subscribe, then sends a signed
+    push (announced once), the same push again (a duplicate), forged and unsigned
+    pushes (ignored) and an old entry (dropped by is_recent). While the channel's
+    lease is current its upload poll is skipped, so pushes are the only way in.
+    """
+    subs = _single(api)
+    channel_id = "UCreplay0"
+    topic = websub.topic_for(channel_id)
+    unlisted = {}
+
+    def unlisted_video(title):
+        # known to the API but not in the uploads playlist, so only a push can surface it
+        video = make_video("video", title)
+        video["snippet"]["channelId"] = channel_id
+        api.video_table[video["id"]] = video
+        return video["id"]
+
+    async def subscribed(r):
+        await r.settle()
+        r.receiver = yt.push_receiver
+        callback = yt.WEBSUB_CALLBACK_URL
+        r.check("subscribe verified", ("subscribe", topic, True) in r.hub.verifications)
+        r.check("lease recorded", r.receiver.is_verified(channel_id))
+        r.check("unrequested topic refused", not await r.hub.verify(callback, "subscribe", websub.topic_for("UCnotours")))
+        r.check("unrequested unsubscribe refused", not await r.hub.verify(callback, "unsubscribe", topic))
+
+    async def signed_push(r):
+        r.upload(channel_id, "video", "Pushed upload")
+        vid = api.channel_table[channel_id]["uploads"][0]
+        unlisted["pushed"] = vid
+        now = datetime.now(timezone.utc)
+        await r.hub.push(yt.WEBSUB_CALLBACK_URL, channel_id, vid, now)
+        await r.hub.push(yt.WEBSUB_CALLBACK_URL, channel_id, vid, now)
+        await r.settle()
+        r.check("signed push announced once", r.announcements_of(vid) == 1)
+        r.check("repeated push counted as duplicate", r.receiver.counters["duplicates"] == 1)
+
+    async def bad_pushes(r):
+        now = datetime.now(timezone.utc)
+        forged, unsigned = unlisted_video("Forged"), unlisted_video("Unsigned")
+        await r.hub.push(yt.WEBSUB_CALLBACK_URL, channel_id, forged, now, signature="forged")
+        await r.hub.push(yt.WEBSUB_CALLBACK_URL, channel_id, unsigned, now, signature="missing")
+        await r.settle()
+        r.check("forged/missing signature ignored",
+                r.receiver.counters["bad_signature"] == 2 and not r.announcements_of(forged)
+                and not r.announcements_of(unsigned))
+
+    async def old_entry(r):
+        old = unlisted_video("Title edit on an old video")
+        await r.hub.push(yt.WEBSUB_CALLBACK_URL, channel_id, old, datetime(2015, 1, 1, tzinfo=timezone.utc))
+        await r.settle()
+        r.check("old <published> entry dropped", not r.announcements_of(old))
+        unlisted["polls"] = yt.poll_scheduler.units.get("playlistItems", 0)
+
+    def leased_poll(r):
+        r.check("leased channel skips upload polls", yt.poll_scheduler.units.get("playlistItems", 0) == unlisted["polls"])
+
+    steps = [subscribed, signed_push, bad_pushes, old_entry, leased_poll]
+    return Replay("websub", subs, steps, api, hub=FakeHub())
+
+
+SCENARIOS = {
+    "quiet": scenario_quiet,
+    "uploads": scenario_uploads,
+    "premieres_streams": scenario_live,
+    "posts": scenario_posts,
+    "multi_channel": scenario_multi_channel,
+    "restart": scenario_restart,
+    "websub": scenario_websub,
+}
+
+
+def _print_report(results):
+    cols = ["scenario", "iterations", "restarts", "quota", "api_calls", "not_modified", "thread_hops",
+            "announced", "latency_avg_ms", "latency_max_ms", "wall_ms", "checks"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in cols))
+    print()
+    for r in results:
+        print(f"{r['scenario']}: units={r['units']} discord={r['discord_ops']}")
+    for r in results:
+        for name in r["failed_checks"]:
+            print(f"[replay] {r['scenario']}: check failed: {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay scripted YouTube activity through yt._monitor_channel offline.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help=f"one of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--latency", type=float, default=20, help="simulated API round trip in ms (default 20)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.scenarios or list(SCENARIOS):
+        api = FakeYouTube(latency=args.latency / 1000)
+        replay = SCENARIOS[name](api)
+        results.append(asyncio.run(replay.run()))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_report(results)
+    if any(r["failed_checks"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()